@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, func
 
 from backend.database import Base
 
@@ -14,3 +14,8 @@ class User(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # Functional index so case-insensitive email lookups are index seeks
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
+
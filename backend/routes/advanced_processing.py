@@ -1,211 +1,423 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import shutil
+import asyncio
+import base64
+from collections import defaultdict
+import hashlib
+import logging
+from operator import attrgetter
+from fastapi import APIRouter, Request, UploadFile, File, HTTPException
+from fastapi.responses import FileResponse
 from pathlib import Path
+from typing import Optional
 from backend.services.advanced_pdf_parser import AdvancedPDFParser
 from backend.services.figure_table_explainer import FigureTableExplainer
+from backend.services.uploads import discard_upload, save_upload, unique_upload_path
+from backend.services import parse_cache
 import json
 import re
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Content-addressed store for figure images so browsers can cache them
+FIGCACHE_DIR = UPLOAD_DIR / ".figcache"
+FIGCACHE_DIR.mkdir(exist_ok=True)
+
+# Shared parser/explainer instances; the parser only holds compiled
+# patterns and the explainer is created lazily since it requires an API key
+PARSER = AdvancedPDFParser()
+_EXPLAINER = None
+
+
+def get_explainer() -> FigureTableExplainer:
+    global _EXPLAINER
+    if _EXPLAINER is None:
+        _EXPLAINER = FigureTableExplainer()
+    return _EXPLAINER
+
+
+# One lock per content hash so simultaneous identical uploads collapse
+# into a single parse job
+_parse_locks: "defaultdict[str, asyncio.Lock]" = defaultdict(asyncio.Lock)
+
+# Compiled once; \d+ already guarantees digit-only matches
+_CITE_NUM_RE = re.compile(r'\d+')
+_FIG_SHA_RE = re.compile(r'[0-9a-f]{64}')
+
+# attrgetter batches the per-row attribute lookups into one C call, which
+# matters when serializing hundreds of citations per paper
+_CITE_FIELDS = ('text', 'position', 'citation_type', 'authors', 'year', 'title')
+_cite_get = attrgetter(*_CITE_FIELDS)
+_FT_FIELDS = ('caption', 'label', 'content_type', 'position', 'page_number', 'ai_explanation')
+_ft_get = attrgetter(*_FT_FIELDS)
+
+
+# Magic-byte signatures for the formats the parser can hand over: page
+# renders are JPEG, while doc.extract_image returns whatever encoding the
+# PDF embeds. Figures are stored and served under their actual type.
+_IMAGE_FORMATS = (
+    (b'\xff\xd8\xff', '.jpg', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', '.png', 'image/png'),
+    (b'GIF8', '.gif', 'image/gif'),
+    (b'BM', '.bmp', 'image/bmp'),
+    (b'II*\x00', '.tiff', 'image/tiff'),
+    (b'MM\x00*', '.tiff', 'image/tiff'),
+)
+
+
+def _sniff_image_format(header: bytes) -> tuple:
+    """Map an image's leading bytes to its (suffix, media type)."""
+    for magic, suffix, media_type in _IMAGE_FORMATS:
+        if header.startswith(magic):
+            return suffix, media_type
+    return '.img', 'application/octet-stream'
+
+
+def store_figure_image(image_base64: Optional[str]) -> Optional[str]:
+    """Persist a figure image by content hash and return its /figure URL."""
+    if not image_base64:
+        return None
+    image_bytes = base64.b64decode(image_base64)
+    sha = hashlib.sha256(image_bytes).hexdigest()
+    suffix, _ = _sniff_image_format(image_bytes[:16])
+    fig_path = FIGCACHE_DIR / f"{sha}{suffix}"
+    if not fig_path.exists():
+        fig_path.write_bytes(image_bytes)
+    return f"/advanced/figure/{sha}"
+
+
+@router.get("/figure/{sha}")
+async def get_figure(sha: str):
+    """Serve a content-addressed figure image with immutable cache headers"""
+    if not _FIG_SHA_RE.fullmatch(sha):
+        raise HTTPException(status_code=404, detail="Figure not found")
+    fig_path = next(FIGCACHE_DIR.glob(f"{sha}.*"), None)
+    if fig_path is None:
+        raise HTTPException(status_code=404, detail="Figure not found")
+    # Sniff the stored bytes rather than trusting the suffix, so entries
+    # cached before formats were recorded still serve the right type
+    with open(fig_path, "rb") as fig_file:
+        _, media_type = _sniff_image_format(fig_file.read(16))
+    return FileResponse(
+        fig_path,
+        media_type=media_type,
+        headers={
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": f'"{sha}"'
+        }
+    )
+
+
+def _parse_pdf_advanced(pdf_path: str) -> dict:
+    """Top-level (picklable) wrapper so the full parse can run in a process pool."""
+    return PARSER.parse_pdf_advanced(pdf_path)
+
+
+def _extract_text_with_layout(pdf_path: str) -> dict:
+    """Top-level (picklable) wrapper so the layout parse can run in a process pool."""
+    return PARSER.extract_text_with_layout(pdf_path)
+
+
+def _extract_all_from_layout(layout_data: dict) -> dict:
+    """Top-level (picklable) wrapper so the regex fan-out can run in a process pool."""
+    return extract_all_from_layout(PARSER, layout_data)
+
+
+async def get_cached_layout(file_path: Path, file_hash: str, parse_pool) -> dict:
+    """Fetch the layout parse from the content-hash cache, parsing on a miss."""
+    layout_data = parse_cache.get_cached(file_hash, "layout")
+    if layout_data is None:
+        layout_data = await asyncio.get_running_loop().run_in_executor(
+            parse_pool, _extract_text_with_layout, str(file_path)
+        )
+        parse_cache.set_cached(file_hash, "layout", layout_data)
+    return layout_data
+
+
+def extract_all_from_layout(parser: AdvancedPDFParser, layout_data: dict) -> dict:
+    """Run citation, figure/table, and math extraction on one shared layout parse."""
+    citations = parser.extract_citations(layout_data['full_text'])
+    figures_tables = parser.extract_figures_tables(layout_data['full_text'], layout_data['pages'])
+    math_content = parser.extract_mathematical_content(layout_data['full_text'], layout_data['pages'])
+
+    # Enrich math content with context/summary/impact similar to advanced extract
+    for m in math_content:
+        topic = parser._infer_topic_from_headings(m.position, layout_data['pages'], layout_data.get('headings', []))
+        nearby = parser._get_nearby_text(layout_data['full_text'], m.position)
+        meaning, impact = parser._summarize_equation(m.equation, nearby)
+        m.context = topic
+        m.summary = meaning
+        m.impact = impact
+
+    return {
+        "citations": [
+            {
+                'text': citation.text,
+                'citation_type': citation.citation_type,
+                'authors': citation.authors,
+                'year': citation.year
+            }
+            for citation in citations
+        ],
+        "total_citations": len(citations),
+        "figures_tables": [
+            {
+                'caption': ft.caption,
+                'label': ft.label,
+                'content_type': ft.content_type,
+                'page_number': ft.page_number
+            }
+            for ft in figures_tables
+        ],
+        "total_figures": len([ft for ft in figures_tables if ft.content_type == 'figure']),
+        "total_tables": len([ft for ft in figures_tables if ft.content_type == 'table']),
+        "mathematical_content": [
+            {
+                'equation': math.equation,
+                'equation_type': math.equation_type,
+                'page_number': math.page_number,
+                'context': math.context,
+                'summary': math.summary,
+                'impact': math.impact
+            }
+            for math in math_content
+        ],
+        "total_equations": len(math_content)
+    }
+
+
+async def get_cached_extraction(file_path: Path, parser: AdvancedPDFParser, file_hash: str, parse_pool) -> dict:
+    """Fetch the combined extraction from the cache, computing it once on a miss."""
+    lock = _parse_locks[file_hash]
+    async with lock:
+        data = parse_cache.get_cached(file_hash, "extract-all")
+        if data is None:
+            layout_data = await get_cached_layout(file_path, file_hash, parse_pool)
+            # The citation/figure/math scans and equation enrichment are
+            # CPU-bound regex work over the whole document, so they stay
+            # off the event loop just like the layout parse itself
+            data = await asyncio.get_running_loop().run_in_executor(
+                parse_pool, _extract_all_from_layout, layout_data
+            )
+            parse_cache.set_cached(file_hash, "extract-all", data)
+    # Evict the per-hash entry once the parse settles so the table doesn't
+    # grow by one lock per unique upload forever. A coroutine that already
+    # fetched this lock object may still acquire it after eviction; the
+    # worst case is one redundant parse of a now-cached file, not a missed
+    # cache write.
+    if _parse_locks.get(file_hash) is lock and not lock.locked():
+        del _parse_locks[file_hash]
+    return data
+
+
+@router.post("/extract-all")
+async def extract_all(request: Request, file: UploadFile = File(...)):
+    """Extract citations, figures/tables, and math content in a single parse"""
+    try:
+        file_path = unique_upload_path(UPLOAD_DIR, file.filename)
+        await save_upload(file, file_path)
+
+        file_hash = parse_cache.sha256_file(str(file_path))
+        data = await get_cached_extraction(file_path, PARSER, file_hash, request.app.state.parse_pool)
+
+        # Clean up
+        discard_upload(file_path)
+
+        return {
+            "status": "success",
+            **data
+        }
+
+    except HTTPException:
+        if 'file_path' in locals():
+            discard_upload(file_path)
+        raise
+    except Exception as e:
+        if 'file_path' in locals():
+            discard_upload(file_path)
+        raise HTTPException(status_code=500, detail=f"Combined extraction failed: {str(e)}")
+
 @router.post("/advanced-extract")
-async def advanced_extract(file: UploadFile = File(...)):
+async def advanced_extract(request: Request, file: UploadFile = File(...)):
     """Extract text with advanced processing including citations, figures, and math content"""
     try:
         # Save uploaded file
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Initialize advanced parser and explainer
-        parser = AdvancedPDFParser()
-        explainer = FigureTableExplainer()
-        
-        # Parse PDF with advanced features
-        result = parser.parse_pdf_advanced(str(file_path))
-        
-        print(f"DEBUG: Found {len(result['figures_tables'])} figures/tables")
-        for idx, ft in enumerate(result['figures_tables'][:3]):  # Log first 3
-            print(f"  [{idx}] {ft.label} - Has image: {bool(ft.image_base64)} - Image size: {len(ft.image_base64) if ft.image_base64 else 0}")
-        
-        # Generate AI explanations for figures and tables
-        figures_tables_with_explanations = explainer.generate_explanations(result['figures_tables'])
-        
-        print(f"DEBUG: Generated explanations for {len(figures_tables_with_explanations)} items")
-        for idx, ft in enumerate(figures_tables_with_explanations[:3]):
-            print(f"  [{idx}] {ft.label} - Has explanation: {bool(ft.ai_explanation)} - Has image: {bool(ft.image_base64)}")
-        
-        # Convert dataclasses to dictionaries for JSON serialization
-        reference_map = result.get('references', {})
-
-        processed_result = {
-            'sections': result['sections'],
-            'citations': [
-                {
-                    'text': citation.text,
-                    'position': citation.position,
-                    'citation_type': citation.citation_type,
-                    'authors': citation.authors,
-                    'year': citation.year,
-                    'title': citation.title,
-                    'reference_numbers': numbers if citation.citation_type == 'numbered' else [],
-                    'resolved_references': [
-                        reference_map[num]
-                        for num in numbers
-                        if num in reference_map
-                    ] if citation.citation_type == 'numbered' else []
-                }
-                for citation in result['citations']
-                for numbers in [[
-                    int(num)
-                    for num in re.findall(r'\d+', citation.text)
-                    if num.isdigit()
-                ]]
-            ],
-            'figures_tables': [
-                {
-                    'caption': ft.caption,
-                    'label': ft.label,
-                    'content_type': ft.content_type,
-                    'position': ft.position,
-                    'page_number': ft.page_number,
-                    'ai_explanation': ft.ai_explanation,
-                    'image_base64': ft.image_base64
+        file_path = unique_upload_path(UPLOAD_DIR, file.filename)
+        await save_upload(file, file_path)
+
+        # Check-then-parse runs under the per-hash lock so simultaneous
+        # identical uploads parse and explain once: the second arrival waits
+        # here and then finds the first one's cache entry
+        file_hash = parse_cache.sha256_file(str(file_path))
+        lock = _parse_locks[file_hash]
+        async with lock:
+            processed_result = parse_cache.get_cached(file_hash, "advanced-extract")
+            if processed_result is None:
+                # Shared explainer; parsing runs in the process pool off the event loop
+                explainer = get_explainer()
+
+                # Parse PDF with advanced features
+                result = await asyncio.get_running_loop().run_in_executor(
+                    request.app.state.parse_pool, _parse_pdf_advanced, str(file_path)
+                )
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Found %d figures/tables", len(result['figures_tables']))
+                    for idx, ft in enumerate(result['figures_tables'][:3]):  # Log first 3
+                        logger.debug("  [%d] %s - Has image: %s - Image size: %d",
+                                     idx, ft.label, bool(ft.image_base64),
+                                     len(ft.image_base64) if ft.image_base64 else 0)
+
+                # Generate AI explanations for figures and tables; the explainer
+                # fans the OpenAI calls out concurrently, so await it on the loop
+                figures_tables_with_explanations = await explainer.generate_explanations(result['figures_tables'])
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Generated explanations for %d items", len(figures_tables_with_explanations))
+                    for idx, ft in enumerate(figures_tables_with_explanations[:3]):
+                        logger.debug("  [%d] %s - Has explanation: %s - Has image: %s",
+                                     idx, ft.label, bool(ft.ai_explanation), bool(ft.image_base64))
+
+                # Convert dataclasses to dictionaries for JSON serialization
+                reference_map = result.get('references', {})
+
+                processed_result = {
+                    'sections': result['sections'],
+                    'citations': [
+                        {
+                            **dict(zip(_CITE_FIELDS, _cite_get(citation))),
+                            'reference_numbers': numbers if citation.citation_type == 'numbered' else [],
+                            'resolved_references': [
+                                reference_map[num]
+                                for num in numbers
+                                if num in reference_map
+                            ] if citation.citation_type == 'numbered' else []
+                        }
+                        for citation in result['citations']
+                        for numbers in [list(map(int, _CITE_NUM_RE.findall(citation.text)))]
+                    ],
+                    'figures_tables': [
+                        {
+                            **dict(zip(_FT_FIELDS, _ft_get(ft))),
+                            'image_url': store_figure_image(ft.image_base64)
+                        }
+                        for ft in figures_tables_with_explanations
+                    ],
+                    'keywords': result['keywords'],
+                    'metadata': result['metadata'],
+                    'references': reference_map
                 }
-                for ft in figures_tables_with_explanations
-            ],
-            'keywords': result['keywords'],
-            'metadata': result['metadata'],
-            'references': reference_map
-        }
-        
+
+                # Cache the serialized result so repeat uploads skip the parse entirely
+                parse_cache.set_cached(file_hash, "advanced-extract", processed_result)
+        # Evict the lock entry once the parse has settled, same as the
+        # extraction caches, so _parse_locks doesn't grow unboundedly
+        if _parse_locks.get(file_hash) is lock and not lock.locked():
+            del _parse_locks[file_hash]
+
         # Clean up uploaded file
-        file_path.unlink(missing_ok=True)
-        
+        discard_upload(file_path)
+
         return {
             "status": "success",
             "data": processed_result
         }
         
+    except HTTPException:
+        if 'file_path' in locals():
+            discard_upload(file_path)
+        raise
     except Exception as e:
         # Clean up uploaded file on error
         if 'file_path' in locals():
-            file_path.unlink(missing_ok=True)
+            discard_upload(file_path)
         
         raise HTTPException(status_code=500, detail=f"Advanced extraction failed: {str(e)}")
 
 @router.post("/extract-citations-only")
-async def extract_citations_only(file: UploadFile = File(...)):
+async def extract_citations_only(request: Request, file: UploadFile = File(...)):
     """Extract only citations from the PDF"""
     try:
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        parser = AdvancedPDFParser()
-        layout_data = parser.extract_text_with_layout(str(file_path))
-        citations = parser.extract_citations(layout_data['full_text'])
-        
+        file_path = unique_upload_path(UPLOAD_DIR, file.filename)
+        await save_upload(file, file_path)
+
+        file_hash = parse_cache.sha256_file(str(file_path))
+        data = await get_cached_extraction(file_path, PARSER, file_hash, request.app.state.parse_pool)
+
         # Clean up
-        file_path.unlink(missing_ok=True)
-        
+        discard_upload(file_path)
+
         return {
             "status": "success",
-            "citations": [
-                {
-                    'text': citation.text,
-                    'citation_type': citation.citation_type,
-                    'authors': citation.authors,
-                    'year': citation.year
-                }
-                for citation in citations
-            ],
-            "total_citations": len(citations)
+            "citations": data["citations"],
+            "total_citations": data["total_citations"]
         }
         
+    except HTTPException:
+        if 'file_path' in locals():
+            discard_upload(file_path)
+        raise
     except Exception as e:
         if 'file_path' in locals():
-            file_path.unlink(missing_ok=True)
+            discard_upload(file_path)
         raise HTTPException(status_code=500, detail=f"Citation extraction failed: {str(e)}")
 
 @router.post("/extract-figures-tables")
-async def extract_figures_tables(file: UploadFile = File(...)):
+async def extract_figures_tables(request: Request, file: UploadFile = File(...)):
     """Extract figures and tables with captions"""
     try:
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        parser = AdvancedPDFParser()
-        layout_data = parser.extract_text_with_layout(str(file_path))
-        figures_tables = parser.extract_figures_tables(layout_data['full_text'], layout_data['pages'])
-        
+        file_path = unique_upload_path(UPLOAD_DIR, file.filename)
+        await save_upload(file, file_path)
+
+        file_hash = parse_cache.sha256_file(str(file_path))
+        data = await get_cached_extraction(file_path, PARSER, file_hash, request.app.state.parse_pool)
+
         # Clean up
-        file_path.unlink(missing_ok=True)
-        
+        discard_upload(file_path)
+
         return {
             "status": "success",
-            "figures_tables": [
-                {
-                    'caption': ft.caption,
-                    'label': ft.label,
-                    'content_type': ft.content_type,
-                    'page_number': ft.page_number
-                }
-                for ft in figures_tables
-            ],
-            "total_figures": len([ft for ft in figures_tables if ft.content_type == 'figure']),
-            "total_tables": len([ft for ft in figures_tables if ft.content_type == 'table'])
+            "figures_tables": data["figures_tables"],
+            "total_figures": data["total_figures"],
+            "total_tables": data["total_tables"]
         }
         
+    except HTTPException:
+        if 'file_path' in locals():
+            discard_upload(file_path)
+        raise
     except Exception as e:
         if 'file_path' in locals():
-            file_path.unlink(missing_ok=True)
+            discard_upload(file_path)
         raise HTTPException(status_code=500, detail=f"Figure/table extraction failed: {str(e)}")
 
 @router.post("/extract-mathematical-content")
-async def extract_mathematical_content(file: UploadFile = File(...)):
+async def extract_mathematical_content(request: Request, file: UploadFile = File(...)):
     """Extract mathematical content and equations"""
     try:
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        parser = AdvancedPDFParser()
-        layout_data = parser.extract_text_with_layout(str(file_path))
-        math_content = parser.extract_mathematical_content(layout_data['full_text'], layout_data['pages'])
-        # Enrich with context/summary/impact similar to advanced extract
-        for m in math_content:
-            topic = parser._infer_topic_from_headings(m.position, layout_data['pages'], layout_data.get('headings', []))
-            nearby = parser._get_nearby_text(layout_data['full_text'], m.position)
-            meaning, impact = parser._summarize_equation(m.equation, nearby)
-            m.context = topic
-            m.summary = meaning
-            m.impact = impact
-        
+        file_path = unique_upload_path(UPLOAD_DIR, file.filename)
+        await save_upload(file, file_path)
+
+        file_hash = parse_cache.sha256_file(str(file_path))
+        data = await get_cached_extraction(file_path, PARSER, file_hash, request.app.state.parse_pool)
+
         # Clean up
-        file_path.unlink(missing_ok=True)
-        
+        discard_upload(file_path)
+
         return {
             "status": "success",
-            "mathematical_content": [
-                {
-                    'equation': math.equation,
-                    'equation_type': math.equation_type,
-                    'page_number': math.page_number,
-                    'context': math.context,
-                    'summary': math.summary,
-                    'impact': math.impact
-                }
-                for math in math_content
-            ],
-            "total_equations": len(math_content)
+            "mathematical_content": data["mathematical_content"],
+            "total_equations": data["total_equations"]
         }
         
+    except HTTPException:
+        if 'file_path' in locals():
+            discard_upload(file_path)
+        raise
     except Exception as e:
         if 'file_path' in locals():
-            file_path.unlink(missing_ok=True)
+            discard_upload(file_path)
         raise HTTPException(status_code=500, detail=f"Mathematical content extraction failed: {str(e)}")
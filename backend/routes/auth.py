@@ -1,10 +1,13 @@
+import asyncio
+import threading
 from datetime import timedelta
 from typing import Annotated
 
+from cachetools import TTLCache
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 
 from backend.database import get_db
 from backend.models.user import User
@@ -22,10 +25,26 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-
-def authenticate_user(db: Session, email: str, password: str) -> User:
-    user = db.query(User).filter(User.email == email.lower()).first()
-    if not user or not verify_password(password, user.hashed_password):
+# Short-lived token -> User cache so repeat requests with the same bearer
+# token skip the decode + DB roundtrip. The 60s TTL bounds how long a
+# deactivated account can keep using an already-validated token.
+# get_current_user runs in FastAPI's threadpool, and TTLCache mutates its
+# internal ordering even on reads, so every access holds the lock.
+_token_user_cache: "TTLCache[str, User]" = TTLCache(maxsize=10_000, ttl=60)
+_token_user_cache_lock = threading.Lock()
+
+
+async def authenticate_user(db: Session, email: str, password: str) -> User:
+    email_lc = email.lower()
+    user = db.query(User).filter(func.lower(User.email) == email_lc).first()
+    password_ok = False
+    if user:
+        # Password hashing is CPU-heavy; verify in the threadpool so one slow
+        # hash doesn't stall other requests on this worker
+        password_ok = await asyncio.get_running_loop().run_in_executor(
+            None, verify_password, password, user.hashed_password
+        )
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -40,6 +59,12 @@ def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: Annotated[Session, Depends(get_db)],
 ) -> User:
+    with _token_user_cache_lock:
+        cached_user = _token_user_cache.get(token)
+    if cached_user is not None:
+        # Re-attach the cached instance to this request's session
+        return db.merge(cached_user, load=False)
+
     try:
         payload = decode_token(token)
     except ValueError:
@@ -49,22 +74,29 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         ) from None
 
-    user = db.query(User).filter(User.id == payload.sub).first()
+    user = db.get(User, payload.sub)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User account is disabled")
+    with _token_user_cache_lock:
+        _token_user_cache[token] = user
     return user
 
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def signup(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user_in.email.lower()).first()
-    if existing_user:
+async def signup(user_in: UserCreate, db: Session = Depends(get_db)):
+    email_lc = user_in.email.lower()
+    email_taken = db.query(
+        db.query(User).filter(func.lower(User.email) == email_lc).exists()
+    ).scalar()
+    if email_taken:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
     try:
-        hashed_password = get_password_hash(user_in.password)
+        hashed_password = await asyncio.get_running_loop().run_in_executor(
+            None, get_password_hash, user_in.password
+        )
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -72,7 +104,7 @@ def signup(user_in: UserCreate, db: Session = Depends(get_db)):
         ) from exc
 
     user = User(
-        email=user_in.email.lower(),
+        email=email_lc,
         full_name=user_in.full_name,
         hashed_password=hashed_password,
     )
@@ -83,11 +115,11 @@ def signup(user_in: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Session = Depends(get_db),
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     access_token_expires = timedelta(minutes=JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(subject=user.id, expires_delta=access_token_expires)
     return Token(access_token=access_token)
@@ -96,15 +128,3 @@ def login(
 @router.get("/me", response_model=UserResponse)
 def read_current_user(current_user: Annotated[User, Depends(get_current_user)]):
     return current_user
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-MAX_BCRYPT_LENGTH = 72
-
-def get_password_hash(password: str) -> str:
-    truncated = password.encode('utf-8')[:MAX_BCRYPT_LENGTH]  # explicitly encode to bytes
-    return pwd_context.hash(truncated)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    truncated = plain_password.encode('utf-8')[:MAX_BCRYPT_LENGTH]
-    return pwd_context.verify(truncated, hashed_password)
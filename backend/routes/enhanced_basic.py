@@ -1,8 +1,9 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import shutil
+import asyncio
+from fastapi import APIRouter, Request, UploadFile, File, HTTPException
 from pathlib import Path
 from backend.routes.detect_headings import extract_headings_from_pdf
-from backend.services.advanced_pdf_parser import AdvancedPDFParser
+from backend.routes.advanced_processing import PARSER, _extract_text_with_layout
+from backend.services.uploads import discard_upload, save_upload, unique_upload_path
 
 router = APIRouter()
 
@@ -10,27 +11,28 @@ UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
 @router.post("/enhanced-extract")
-async def enhanced_basic_extract(file: UploadFile = File(...)):
+async def enhanced_basic_extract(request: Request, file: UploadFile = File(...)):
     """Enhanced basic extraction with optional advanced features"""
     try:
         # Save uploaded file
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        file_path = unique_upload_path(UPLOAD_DIR, file.filename)
+        await save_upload(file, file_path)
 
         # Extract basic sections
         sections = extract_headings_from_pdf(str(file_path))
         
-        # Also extract some advanced features for enhanced UI
-        parser = AdvancedPDFParser()
-        layout_data = parser.extract_text_with_layout(str(file_path))
+        # Also extract some advanced features for enhanced UI; the layout
+        # parse is CPU-bound so it runs in the shared process pool
+        layout_data = await asyncio.get_running_loop().run_in_executor(
+            request.app.state.parse_pool, _extract_text_with_layout, str(file_path)
+        )
         
         # Get basic citation count and keyword extraction
-        citations = parser.extract_citations(layout_data['full_text'])
-        keywords = parser.extract_keywords(layout_data['full_text'])
+        citations = PARSER.extract_citations(layout_data['full_text'])
+        keywords = PARSER.extract_keywords(layout_data['full_text'])
         
         # Clean up uploaded file
-        file_path.unlink(missing_ok=True)
+        discard_upload(file_path)
         
         return {
             "status": "success",
@@ -51,9 +53,13 @@ async def enhanced_basic_extract(file: UploadFile = File(...)):
             }
         }
         
+    except HTTPException:
+        if 'file_path' in locals():
+            discard_upload(file_path)
+        raise
     except Exception as e:
         # Clean up uploaded file on error
         if 'file_path' in locals():
-            file_path.unlink(missing_ok=True)
+            discard_upload(file_path)
         
         raise HTTPException(status_code=500, detail=f"Enhanced extraction failed: {str(e)}")
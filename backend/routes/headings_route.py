@@ -1,8 +1,8 @@
 # backend/routes/headings_route.py
 from fastapi import APIRouter, UploadFile, File
-import shutil
 from pathlib import Path
 from backend.routes.detect_headings import extract_headings_from_pdf
+from backend.services.uploads import save_upload, unique_upload_path
 
 router = APIRouter()
 
@@ -11,10 +11,9 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 
 @router.post("/extract-headings")
 async def extract_headings(file: UploadFile = File(...)):
-    file_path = UPLOAD_DIR / file.filename
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    file_path = unique_upload_path(UPLOAD_DIR, file.filename)
+
+    await save_upload(file, file_path)
 
     sections = extract_headings_from_pdf(str(file_path))
     return {"sections": sections}
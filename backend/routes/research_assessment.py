@@ -1,53 +1,132 @@
+import asyncio
+import logging
+
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-import shutil
-from pathlib import Path
+from collections import Counter, OrderedDict
+from dataclasses import asdict
+from backend.services import parse_cache
 from backend.services.advanced_pdf_parser import AdvancedPDFParser
+from backend.services.uploads import read_upload
 from backend.services.research_assessment import ResearchPaperAssessor
 import json
 import hashlib
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+# Shared parser instance: AdvancedPDFParser holds only precompiled patterns
+# and stop-word tables, so one instance serves every request
+PARSER = AdvancedPDFParser()
+
+# The assessor needs OPENAI_API_KEY at construction, so build it lazily on
+# first use. assess_research_paper returns the score breakdown alongside
+# the assessment, so concurrent requests share the instance lock-free.
+_ASSESSOR = None
+
+def get_assessor() -> ResearchPaperAssessor:
+    global _ASSESSOR
+    if _ASSESSOR is None:
+        _ASSESSOR = ResearchPaperAssessor()
+    return _ASSESSOR
 
-# Simple in-memory cache for assessment results
-assessment_cache = {}
+def close_assessor() -> None:
+    """Close the assessor's pooled HTTP session; called from app shutdown."""
+    if _ASSESSOR is not None:
+        _ASSESSOR.close()
 
-def get_or_create_assessment(file_path: str) -> tuple:
+# Bounded LRU cache for assessment results: hits are moved to the end so
+# hot papers survive eviction, and the least-recently-used entry is dropped
+# on overflow instead of whatever happened to be inserted first
+MAX_CACHED_ASSESSMENTS = 10
+assessment_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+def get_or_create_assessment(pdf_bytes: bytes) -> tuple:
     """
     Get assessment from cache or create new one.
     Returns (assessment, score_breakdown)
     """
-    # Create hash of file content for caching
-    with open(file_path, 'rb') as f:
-        file_hash = hashlib.md5(f.read()).hexdigest()
-    
+    # Key the cache on a hash of the raw bytes (BLAKE2b is faster than md5
+    # on modern CPUs)
+    file_hash = hashlib.blake2b(pdf_bytes).hexdigest()
+
     # Check if assessment exists in cache
     if file_hash in assessment_cache:
-        print(f"Using cached assessment for file hash: {file_hash[:8]}...")
+        logger.debug("Using cached assessment for file hash: %.8s...", file_hash)
+        assessment_cache.move_to_end(file_hash)
         return assessment_cache[file_hash]
-    
+
+    # Fall back to the on-disk cache: assessments survive restarts and the
+    # small in-memory LRU, keyed by content hash and parser version so a
+    # parser change invalidates stale entries. diskcache enforces its own
+    # size cap with LRU-style eviction.
+    cached = parse_cache.get_cached(file_hash, "assessment")
+    if cached is not None:
+        logger.debug("Using disk-cached assessment for file hash: %.8s...", file_hash)
+        _remember_assessment(file_hash, cached)
+        return cached
+
     # Create new assessment
-    print(f"Creating new assessment for file hash: {file_hash[:8]}...")
-    parser = AdvancedPDFParser()
-    paper_content = parser.parse_pdf_advanced(file_path)
-    
-    assessor = ResearchPaperAssessor()
-    assessment = assessor.assess_research_paper(paper_content)
-    score_breakdown = assessor.get_last_score_breakdown()
-    
-    # Cache the results
-    assessment_cache[file_hash] = (assessment, score_breakdown)
-    
-    # Limit cache size to prevent memory issues
-    if len(assessment_cache) > 10:
-        # Remove oldest entry (simple FIFO)
-        oldest_key = next(iter(assessment_cache))
-        del assessment_cache[oldest_key]
-    
-    return assessment, score_breakdown
+    logger.debug("Creating new assessment for file hash: %.8s...", file_hash)
+    paper_content = PARSER.parse_pdf_advanced(pdf_bytes)
+
+    assessor = get_assessor()
+    assessment, score_breakdown = assessor.assess_research_paper(paper_content)
+
+    result = (assessment, score_breakdown)
+    _remember_assessment(file_hash, result)
+    parse_cache.set_cached(file_hash, "assessment", result)
+
+    return result
+
+def _remember_assessment(file_hash: str, result: tuple) -> None:
+    """Insert into the in-memory LRU, evicting the oldest entry on overflow."""
+    assessment_cache[file_hash] = result
+    if len(assessment_cache) > MAX_CACHED_ASSESSMENTS:
+        assessment_cache.popitem(last=False)
+
+def _serialize_assessment(assessment, score_breakdown, extras: dict = None) -> dict:
+    """
+    Convert an assessment to its JSON-serializable form, walking
+    missing_content once to build both the item list and the importance
+    counts for the summary.
+    """
+    counts = Counter()
+    missing_items = []
+    for content in assessment.missing_content:
+        counts[content.importance] += 1
+        missing_items.append(asdict(content))
+
+    data = {
+        "paper_title": assessment.paper_title,
+        "research_field": assessment.research_field,
+        "overall_completeness_score": assessment.overall_completeness_score,
+        "missing_content": missing_items,
+        "strengths": assessment.strengths,
+        "weaknesses": assessment.weaknesses,
+        "recommendations": assessment.recommendations,
+        "methodology_analysis": assessment.methodology_analysis,
+        "literature_review_analysis": assessment.literature_review_analysis,
+        "results_analysis": assessment.results_analysis,
+        "discussion_analysis": assessment.discussion_analysis,
+        "assessment_summary": {
+            "total_missing_items": len(missing_items),
+            "critical_missing": counts["Critical"],
+            "important_missing": counts["Important"],
+            "beneficial_missing": counts["Beneficial"]
+        },
+        "score_breakdown": score_breakdown
+    }
+    if extras:
+        data.update(extras)
+    return data
+
+# Allow-lists for the focused assessment types, precompiled as frozensets
+# so membership checks are O(1) instead of scanning a list per item
+_QUICK_IMPORTANCE = frozenset({"Critical", "Important"})
+_LITERATURE_CATEGORIES = frozenset({"literature review", "literature", "related work"})
 
 class AssessmentRequest(BaseModel):
     """Request model for research paper assessment"""
@@ -66,65 +145,33 @@ async def assess_research_paper(file: UploadFile = File(...)):
     4. Gives a completeness score
     """
     try:
-        # Save uploaded file
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Get or create assessment (cached)
-        assessment, score_breakdown = get_or_create_assessment(str(file_path))
-        
-        print(f"COMPREHENSIVE - Completeness Score: {assessment.overall_completeness_score}")
-        print(f"COMPREHENSIVE - Score Breakdown: {score_breakdown}")
-        
-        # Convert assessment to JSON-serializable format
-        assessment_data = {
-            "paper_title": assessment.paper_title,
-            "research_field": assessment.research_field,
-            "overall_completeness_score": assessment.overall_completeness_score,
-            "missing_content": [
-                {
-                    "category": content.category,
-                    "topic": content.topic,
-                    "importance": content.importance,
-                    "description": content.description,
-                    "suggestion": content.suggestion,
-                    "related_sections": content.related_sections
-                }
-                for content in assessment.missing_content
-            ],
-            "strengths": assessment.strengths,
-            "weaknesses": assessment.weaknesses,
-            "recommendations": assessment.recommendations,
-            "methodology_analysis": assessment.methodology_analysis,
-            "literature_review_analysis": assessment.literature_review_analysis,
-            "results_analysis": assessment.results_analysis,
-            "discussion_analysis": assessment.discussion_analysis,
-            "assessment_summary": {
-                "total_missing_items": len(assessment.missing_content),
-                "critical_missing": len([c for c in assessment.missing_content if c.importance == "Critical"]),
-                "important_missing": len([c for c in assessment.missing_content if c.importance == "Important"]),
-                "beneficial_missing": len([c for c in assessment.missing_content if c.importance == "Beneficial"])
-            },
-            "score_breakdown": score_breakdown
-        }
+        # Read the upload once (size-capped) and parse straight from
+        # memory: no disk round-trip and no unlink races between endpoints
+        content = await read_upload(file)
+
+        # Get or create assessment (cached). Parsing and assessing are
+        # synchronous and CPU-heavy, so run them in the threadpool to keep
+        # the event loop free for other requests
+        assessment, score_breakdown = await asyncio.get_running_loop().run_in_executor(
+            None, get_or_create_assessment, content
+        )
         
-        # Clean up uploaded file
-        file_path.unlink(missing_ok=True)
+        logger.debug("COMPREHENSIVE - score: %s breakdown: %s",
+                     assessment.overall_completeness_score, score_breakdown)
         
-        return {
+        # Return a response object directly so FastAPI skips its Python-level
+        # jsonable_encoder walk and orjson encodes the payload in C
+        return ORJSONResponse({
             "status": "success",
             "message": "Research paper assessment completed successfully",
-            "assessment": assessment_data
-        }
+            "assessment": _serialize_assessment(assessment, score_breakdown)
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
-        # Clean up uploaded file on error
-        if 'file_path' in locals():
-            file_path.unlink(missing_ok=True)
-        
         raise HTTPException(
-            status_code=500, 
+            status_code=500,
             detail=f"Research paper assessment failed: {str(e)}"
         )
 
@@ -135,77 +182,49 @@ async def assess_paper_content(request: AssessmentRequest):
     Useful when you have the paper content in memory.
     """
     try:
-        # Initialize research assessor
-        assessor = ResearchPaperAssessor()
-        
-        # Perform assessment based on type
-        if request.assessment_type == "comprehensive":
-            assessment = assessor.assess_research_paper(request.paper_content)
-            score_breakdown = assessor.get_last_score_breakdown()
-        elif request.assessment_type == "quick":
-            # Quick assessment focusing only on major missing elements
-            assessment = assessor.assess_research_paper(request.paper_content)
-            score_breakdown = assessor.get_last_score_breakdown()
+        if request.assessment_type not in {"comprehensive", "quick", "methodology", "literature"}:
+            raise HTTPException(status_code=400, detail="Invalid assessment type")
+
+        # Every assessment type runs the same underlying assessment; only
+        # the post-hoc filter differs
+        assessor = get_assessor()
+        assessment, score_breakdown = await asyncio.get_running_loop().run_in_executor(
+            None, assessor.assess_research_paper, request.paper_content
+        )
+
+        if request.assessment_type == "quick":
             # Filter to only critical and important missing content
             assessment.missing_content = [
-                content for content in assessment.missing_content 
-                if content.importance in ["Critical", "Important"]
+                content for content in assessment.missing_content
+                if content.importance in _QUICK_IMPORTANCE
             ]
         elif request.assessment_type == "methodology":
             # Focus on methodology analysis
-            assessment = assessor.assess_research_paper(request.paper_content)
-            score_breakdown = assessor.get_last_score_breakdown()
             assessment.missing_content = [
-                content for content in assessment.missing_content 
+                content for content in assessment.missing_content
                 if content.category.lower() == "methodology"
             ]
         elif request.assessment_type == "literature":
             # Focus on literature review analysis
-            assessment = assessor.assess_research_paper(request.paper_content)
-            score_breakdown = assessor.get_last_score_breakdown()
             assessment.missing_content = [
-                content for content in assessment.missing_content 
-                if content.category.lower() in ["literature review", "literature", "related work"]
+                content for content in assessment.missing_content
+                if content.category.lower() in _LITERATURE_CATEGORIES
             ]
-        else:
-            raise HTTPException(status_code=400, detail="Invalid assessment type")
         
-        # Convert to JSON-serializable format
-        assessment_data = {
-            "paper_title": assessment.paper_title,
-            "research_field": assessment.research_field,
-            "overall_completeness_score": assessment.overall_completeness_score,
-            "missing_content": [
-                {
-                    "category": content.category,
-                    "topic": content.topic,
-                    "importance": content.importance,
-                    "description": content.description,
-                    "suggestion": content.suggestion,
-                    "related_sections": content.related_sections
-                }
-                for content in assessment.missing_content
-            ],
-            "strengths": assessment.strengths,
-            "weaknesses": assessment.weaknesses,
-            "recommendations": assessment.recommendations,
-            "methodology_analysis": assessment.methodology_analysis,
-            "literature_review_analysis": assessment.literature_review_analysis,
-            "results_analysis": assessment.results_analysis,
-            "discussion_analysis": assessment.discussion_analysis,
-            "assessment_type": request.assessment_type,
-            "score_breakdown": score_breakdown
-        }
-        
-        return {
+        return ORJSONResponse({
             "status": "success",
             "message": f"{request.assessment_type.title()} assessment completed",
-            "assessment": assessment_data
-        }
+            "assessment": _serialize_assessment(
+                assessment, score_breakdown,
+                extras={"assessment_type": request.assessment_type}
+            )
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
-            status_code=500, 
+            status_code=500,
             detail=f"Paper content assessment failed: {str(e)}"
         )
 
@@ -216,35 +235,29 @@ async def quick_missing_analysis(file: UploadFile = File(...)):
     This reuses the comprehensive assessment logic to ensure score consistency.
     """
     try:
-        # Save uploaded file
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Get or create assessment (cached - same as comprehensive)
-        assessment, score_breakdown = get_or_create_assessment(str(file_path))
-        
-        print(f"QUICK - Completeness Score: {assessment.overall_completeness_score}")
-        print(f"QUICK - Score Breakdown: {score_breakdown}")
+        # Read the upload once (size-capped) and parse straight from
+        # memory: no disk round-trip and no unlink races between endpoints
+        content = await read_upload(file)
+
+        # Get or create assessment (cached - same as comprehensive),
+        # offloaded to the threadpool like /assess-paper
+        assessment, score_breakdown = await asyncio.get_running_loop().run_in_executor(
+            None, get_or_create_assessment, content
+        )
         
-        # Filter to only critical missing content
-        critical_missing = [
-            {
-                "category": content.category,
-                "topic": content.topic,
-                "importance": content.importance,
-                "description": content.description,
-                "suggestion": content.suggestion,
-                "related_sections": content.related_sections
-            }
-            for content in assessment.missing_content 
-            if content.importance == "Critical"
-        ]
+        logger.debug("QUICK - score: %s breakdown: %s",
+                     assessment.overall_completeness_score, score_breakdown)
         
-        # Clean up uploaded file
-        file_path.unlink(missing_ok=True)
+        # One pass: collect the critical items and tally every importance
+        # level for the summary at the same time
+        counts = Counter()
+        critical_missing = []
+        for content in assessment.missing_content:
+            counts[content.importance] += 1
+            if content.importance == "Critical":
+                critical_missing.append(asdict(content))
         
-        return {
+        return ORJSONResponse({
             "status": "success",
             "message": "Quick missing content analysis completed",
             "paper_title": assessment.paper_title,
@@ -257,18 +270,17 @@ async def quick_missing_analysis(file: UploadFile = File(...)):
             # Include assessment summary for consistency
             "assessment_summary": {
                 "total_missing_items": len(assessment.missing_content),
-                "critical_missing": len([c for c in assessment.missing_content if c.importance == "Critical"]),
-                "important_missing": len([c for c in assessment.missing_content if c.importance == "Important"]),
-                "beneficial_missing": len([c for c in assessment.missing_content if c.importance == "Beneficial"])
+                "critical_missing": counts["Critical"],
+                "important_missing": counts["Important"],
+                "beneficial_missing": counts["Beneficial"]
             }
-        }
-        
+        })
+
+    except HTTPException:
+        raise
     except Exception as e:
-        if 'file_path' in locals():
-            file_path.unlink(missing_ok=True)
-        
         raise HTTPException(
-            status_code=500, 
+            status_code=500,
             detail=f"Quick analysis failed: {str(e)}"
         )
 
@@ -1,14 +1,20 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import requests
+import asyncio
+import hashlib
+import logging
+import httpx
+import json
 import os
+from collections import OrderedDict
 from dotenv import load_dotenv
-from openai import OpenAI
 
 
 # Load environment variables from .env
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Get API key from .env
@@ -17,6 +23,23 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise RuntimeError("OPENAI_API_KEY is missing from .env file")
 
+# Shared async client so calls reuse pooled keep-alive connections instead
+# of paying a TLS handshake each. The auth header is resolved once here
+# rather than rebuilt per call.
+_openai_client = httpx.AsyncClient(
+    base_url="https://api.openai.com/v1",
+    headers={
+        "Authorization": f"Bearer {OPENAI_API_KEY}",
+        "Content-Type": "application/json"
+    },
+    timeout=60,
+    http2=True,
+)
+
+async def close_openai_client() -> None:
+    """Close the pooled OpenAI client; called from app shutdown."""
+    await _openai_client.aclose()
+
 # Request model for summarization
 class SummarizeRequest(BaseModel):
     abstract: str
@@ -26,7 +49,7 @@ class SummarizeRequest(BaseModel):
 
 
 # Helper function to call LLM
-def summarize_text(section_name: str, text: str, summary_length: int = 200) -> str:
+async def summarize_text(section_name: str, text: str, summary_length: int = 200) -> str:
     if not text.strip():
         return "No content available."
     
@@ -34,7 +57,7 @@ def summarize_text(section_name: str, text: str, summary_length: int = 200) -> s
     max_chars = 8000  # Conservative limit to avoid token issues
     if len(text) > max_chars:
         text = text[:max_chars] + "..."
-        print(f"Warning: {section_name} text truncated to {max_chars} characters")
+        logger.warning("%s text truncated to %d characters", section_name, max_chars)
     
     # Fixed optimal summary length for basic summarizer
     prompt = f"""
@@ -47,12 +70,8 @@ def summarize_text(section_name: str, text: str, summary_length: int = 200) -> s
     """
     
     try:
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "Content-Type": "application/json"
-            },
+        response = await _openai_client.post(
+            "/chat/completions",
             json={
                 "model": "gpt-3.5-turbo",
                 "messages": [
@@ -65,43 +84,137 @@ def summarize_text(section_name: str, text: str, summary_length: int = 200) -> s
         )
         
         if response.status_code != 200:
-            print(f"OpenAI API Error: {response.status_code}")
-            print(f"Response: {response.text}")
+            logger.error("OpenAI API error %s: %s", response.status_code, response.text)
             return f"API Error: {response.status_code} - {response.text}"
             
         response.raise_for_status()
         data = response.json()
         return data["choices"][0]["message"]["content"]
 
-    except requests.exceptions.RequestException as e:
-        print(f"Request error for {section_name}: {str(e)}")
+    except httpx.HTTPError as e:
+        logger.error("Request error for %s: %s", section_name, e)
         return f"Network error summarizing {section_name}: {str(e)}"
     except KeyError as e:
-        print(f"Response parsing error for {section_name}: {str(e)}")
+        logger.error("Response parsing error for %s: %s", section_name, e)
         return f"Response parsing error: {str(e)}"
     except Exception as e:
-        print(f"Unexpected error for {section_name}: {str(e)}")
+        logger.error("Unexpected error for %s: %s", section_name, e)
         return f"Error summarizing {section_name}: {str(e)}"
 
+# Bounded LRU of finished summaries keyed by (section, content hash,
+# length). At temperature 0.3 identical inputs don't need a fresh call, so
+# re-uploads of the same paper skip OpenAI entirely.
+_SUMMARY_CACHE_MAX = 512
+_summary_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+def _summary_key(section_name: str, text: str, summary_length: int) -> tuple:
+    return (section_name, hashlib.blake2b(text.encode()).hexdigest(), summary_length)
+
+def _summary_cache_get(key: tuple) -> str | None:
+    cached = _summary_cache.get(key)
+    if cached is not None:
+        _summary_cache.move_to_end(key)
+    return cached
+
+def _summary_cache_put(key: tuple, summary: str) -> None:
+    _summary_cache[key] = summary
+    if len(_summary_cache) > _SUMMARY_CACHE_MAX:
+        _summary_cache.popitem(last=False)
+
+# Per-section character cap: three sections must fit one gpt-3.5 context
+_BATCH_MAX_CHARS = 4000
+
+async def summarize_all(abstract: str, introduction: str, main_body: str,
+                        summary_length: int = 200) -> dict:
+    """Summarize all three sections with a single chat request.
+
+    The system prompt and instructions are identical for every section, so
+    batching amortizes the shared prefix once and collapses three round
+    trips into one. Falls back to per-section calls if the sections are too
+    long for one request or the batched response can't be parsed.
+    """
+    sections = {"abstract": abstract, "introduction": introduction, "main_body": main_body}
+    results = {}
+    non_empty = {}
+    for name, text in sections.items():
+        if not text.strip():
+            results[name] = "No content available."
+            continue
+        cached = _summary_cache_get(_summary_key(name, text, summary_length))
+        if cached is not None:
+            results[name] = cached
+        else:
+            non_empty[name] = text
+
+    # Everything was empty or cached — no network call needed
+    if not non_empty:
+        return {name: results[name] for name in sections}
+
+    batchable = all(len(text) <= _BATCH_MAX_CHARS for text in non_empty.values())
+    if batchable:
+        prompt = (
+            f"Summarize each section of a research paper below in approximately "
+            f"{summary_length} words. Focus on the key points, main findings, and "
+            f"important conclusions. Respond with a JSON object whose keys are "
+            f"exactly {list(non_empty)} and whose values are the summaries.\n\n"
+        )
+        prompt += "\n\n".join(f"### {name}\n{text}" for name, text in non_empty.items())
+
+        try:
+            response = await _openai_client.post(
+                "/chat/completions",
+                json={
+                    "model": "gpt-3.5-turbo",
+                    "messages": [
+                        {"role": "system", "content": "You are an academic paper summarizer. Provide clear, concise summaries."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": 0.3,
+                    "max_tokens": 500 * len(non_empty),
+                    "response_format": {"type": "json_object"}
+                }
+            )
+            response.raise_for_status()
+            parsed = json.loads(response.json()["choices"][0]["message"]["content"])
+            if all(isinstance(parsed.get(name), str) for name in non_empty):
+                for name, text in non_empty.items():
+                    results[name] = parsed[name]
+                    _summary_cache_put(_summary_key(name, text, summary_length), parsed[name])
+                return {name: results[name] for name in sections}
+        except (httpx.HTTPError, json.JSONDecodeError, KeyError) as e:
+            logger.warning("Batched summary failed, falling back to per-section calls: %s", e)
+
+    # Fallback: per-section calls, still fired concurrently
+    section_labels = {"abstract": "abstract", "introduction": "introduction", "main_body": "main body"}
+    values = await asyncio.gather(
+        *(summarize_text(section_labels[name], non_empty[name], summary_length) for name in non_empty)
+    )
+    for name, summary in zip(non_empty, values):
+        results[name] = summary
+        # Don't cache the error strings summarize_text returns on failure
+        if not summary.startswith(("API Error", "Network error", "Response parsing error", "Error summarizing")):
+            _summary_cache_put(_summary_key(name, non_empty[name], summary_length), summary)
+    return {name: results[name] for name in sections}
+
 # Route to summarize sections
 @router.post("/")
 async def summarize_sections(request: SummarizeRequest):
-    print("Incoming request:", request.dict())  # 👈 check yeh print ho raha hai
+    if logger.isEnabledFor(logging.DEBUG):
+        # Gated: request.dict() is not free on large bodies
+        logger.debug("Incoming request: %s", request.dict())
+        logger.debug("Text lengths - abstract: %d introduction: %d main body: %d",
+                     len(request.abstract), len(request.introduction), len(request.main_body))
     try:
         # Use fixed optimal length for basic summarizer
         optimal_length = request.summary_length or 200
         
-        # Debug: Print text lengths
-        print(f"Text lengths - Abstract: {len(request.abstract)}, Introduction: {len(request.introduction)}, Main Body: {len(request.main_body)}")
-        
-        summaries = {
-            "abstract": summarize_text("abstract", request.abstract, optimal_length),
-            "introduction": summarize_text("introduction", request.introduction, optimal_length),
-            "main_body": summarize_text("main body", request.main_body, optimal_length)
-        }
+        # One batched request covers all three sections when they fit;
+        # otherwise this falls back to concurrent per-section calls
+        summaries = await summarize_all(
+            request.abstract, request.introduction, request.main_body, optimal_length
+        )
         return {"status": "success", "summaries": summaries}
 
     except Exception as e:
-        import traceback
-        print("Backend error:", traceback.format_exc())
+        logger.exception("Summarization failed")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Optional
 
-from pydantic import BaseModel, EmailStr, constr
+from pydantic import BaseModel, EmailStr, StringConstraints
+
+# Validated inline by pydantic-core, unlike the legacy constr() factory
+Password = Annotated[str, StringConstraints(min_length=8, max_length=72)]
 
 
 class UserBase(BaseModel):
@@ -10,7 +13,7 @@ class UserBase(BaseModel):
 
 
 class UserCreate(UserBase):
-    password: constr(min_length=8, max_length=72)
+    password: Password
 
 
 class UserLogin(BaseModel):
@@ -1,12 +1,144 @@
 import fitz  # PyMuPDF
+import logging
 import re
 import base64
+import heapq
 import math
+from bisect import bisect_right
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 from pathlib import Path
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Page-shard extraction: worker cap and the document size below which the
+# process-spawn overhead outweighs the parallel win
+_SHARD_WORKERS = 4
+_MIN_PAGES_FOR_POOL = 8
+
+# Longest edge, in pixels, for full-page fallback renders. Downstream
+# consumers display or analyze the image at roughly this scale, so larger
+# pixmaps are pure memory and encode-time waste.
+_RENDER_TARGET_PX = 1024
+
+# Metadata-prefix and month tables for title detection, hoisted to module
+# level so the per-span candidate loop doesn't rebuild them for every span.
+# str.startswith accepts a tuple, checking all prefixes in one C-level call.
+_SPAN_EXCLUDED_PREFIXES = (
+    'abstract', 'introduction', 'arxiv:', 'submitted', 'received',
+    'accepted', 'published', 'volume', 'issue', 'doi:', 'issn:',
+    'proceedings', 'conference', 'journal', 'workshop', 'symposium',
+)
+_TITLE_EXCLUDED_PREFIXES = (
+    'abstract', 'introduction', 'author', 'university', 'journal', 'proceedings',
+    'conference', 'workshop', 'symposium', 'arxiv:', 'submitted', 'received',
+    'accepted', 'published', 'volume', 'issue', 'doi:', 'issn:', 'email:',
+    'address:', 'department', 'institute', 'college', 'school',
+)
+_MONTH_NAMES = (
+    'jan', 'feb', 'mar', 'apr', 'may', 'jun',
+    'jul', 'aug', 'sep', 'oct', 'nov', 'dec',
+)
+_TITLE_KEYWORDS = (
+    'analysis', 'study', 'method', 'approach', 'system', 'model',
+    'framework', 'learning', 'algorithm', 'neural', 'deep', 'machine',
+)
+
+# Stop words shared by every parser instance. Interning lets the membership
+# probe in the keyword tokenizer hit the identity fast path for common words
+# instead of comparing characters, and a frozenset is hashed once and never
+# resized.
+_STOP_WORDS = frozenset(sys.intern(word) for word in (
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'then', 'else', 'when', 'while', 'where',
+    'with', 'without', 'within', 'between', 'among', 'into', 'onto', 'through', 'across',
+    'from', 'over', 'under', 'above', 'below', 'around', 'about', 'before', 'after',
+    'first', 'second', 'third', 'fourth', 'fifth', 'last', 'former', 'latter', 'new', 'old',
+    'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten', 'per',
+    'each', 'every', 'many', 'several', 'various', 'other', 'another', 'any', 'all', 'both',
+    'few', 'more', 'most', 'some', 'such', 'same', 'different', 'similar', 'varied',
+    'we', 'you', 'they', 'he', 'she', 'it', 'our', 'your', 'their', 'its', 'his', 'her',
+    'who', 'whom', 'whose', 'which', 'that', 'this', 'these', 'those', 'there', 'here',
+    'been', 'being', 'was', 'were', 'are', 'is', 'am', 'be', 'have', 'has', 'had', 'having',
+    'do', 'does', 'did', 'doing', 'also', 'however', 'therefore', 'furthermore', 'moreover',
+    'because', 'since', 'although', 'though', 'whereas', 'yet', 'besides', 'overall',
+    'research', 'paper', 'study', 'article', 'work', 'result', 'results', 'finding',
+    'findings', 'approach', 'approaches', 'method', 'methods', 'analysis', 'data', 'dataset',
+    'datasets', 'model', 'models', 'system', 'systems', 'figure', 'figures', 'table', 'tables',
+    'section', 'sections', 'introduction', 'related', 'conclusion', 'discussion',
+    'abstract', 'summary', 'contributions', 'overview', 'proposed', 'presented', 'including',
+    'via', 'based', 'using', 'use', 'used', 'according', 'towards', 'toward',
+    'amongst', 'throughout', 'whereby', 'whichever', 'whenever',
+))
+
+
+# True in processes spawned as parse workers, set via the pool initializer
+# below. Document-level extraction consults it so a worker never nests
+# another process pool inside itself (or forks while its sibling
+# ThreadPoolExecutor threads are running).
+_in_parse_worker = False
+
+
+def mark_parse_worker() -> None:
+    """ProcessPoolExecutor initializer: flag this process as a parse worker."""
+    global _in_parse_worker
+    _in_parse_worker = True
+
+
+def _extract_page_record(page, page_num: int) -> tuple:
+    """Build the (page_number, text, blocks) record for a single page.
+
+    Layout blocks are only consumed by title extraction on the first page;
+    there, one textpage built without image blocks backs both the plain-text
+    and dict extractions so MuPDF walks the page content a single time.
+    """
+    if page_num != 0:
+        return (page_num + 1, page.get_text(), [])
+    textpage = page.get_textpage(flags=fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES)
+    return (
+        1,
+        page.get_text(textpage=textpage),
+        page.get_text("dict", textpage=textpage)["blocks"],
+    )
+
+
+def _extract_page_shard(pdf_path: str, start: int, stop: int) -> List[tuple]:
+    """Extract text and layout blocks for a contiguous page range.
+
+    Module-level so ProcessPoolExecutor can pickle it; each worker opens its
+    own document handle, sidestepping MuPDF's serial context.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        return [
+            _extract_page_record(doc[page_num], page_num)
+            for page_num in range(start, stop)
+        ]
+    finally:
+        doc.close()
+
+
+def _extract_page_images_shard(pdf_path: str, page_numbers: List[int]) -> List[tuple]:
+    """Extract the representative image for a batch of pages in a worker.
+
+    Module-level for pickling; builds its own parser (pattern binding only,
+    compilation happened at import) and reuses its page-image logic.
+    """
+    parser = AdvancedPDFParser()
+    doc = fitz.open(pdf_path)
+    try:
+        return [
+            (page_number, parser._extract_page_image(pdf_path, page_number, doc=doc))
+            for page_number in page_numbers
+        ]
+    finally:
+        doc.close()
+
+@dataclass(slots=True)
 class Citation:
     """Represents a citation found in the text"""
     text: str
@@ -16,7 +148,7 @@ class Citation:
     year: Optional[str]
     title: Optional[str]
 
-@dataclass
+@dataclass(slots=True)
 class FigureTable:
     """Represents a figure or table found in the text"""
     caption: str
@@ -27,7 +159,7 @@ class FigureTable:
     ai_explanation: Optional[str] = None  # AI-generated explanation of the figure/table content
     image_base64: Optional[str] = None  # Base64-encoded image of the figure/table
 
-@dataclass
+@dataclass(slots=True)
 class MathematicalContent:
     """Represents mathematical content found in the text"""
     equation: str
@@ -38,76 +170,186 @@ class MathematicalContent:
     summary: Optional[str] = None  # Plain-English meaning
     impact: Optional[str] = None   # Expected effect on results
 
+# Citation patterns, combined into one alternation so extraction is a
+# single scan over the text instead of one pass per citation type.
+# Named subgroups carry the per-type captures (inner group numbers
+# shift inside an alternation, so positional access is unreliable).
+_CITATION_PATTERN = re.compile(
+    r'\b(?P<author_year>(?P<ay_authors>[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s*\((?P<ay_year>\d{4})\))'
+    r'|(?P<numbered>\[(?P<num_list>\d{1,3}(?:,\s*\d{1,3})*)\])'  # More reasonable citation numbers (1-999)
+    r'|(?P<footnote>\^(?P<fn_num>\d+)\b)'
+    r'|\b(?P<et_al>(?P<ea_authors>[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+et\s+al\.?\s*\((?P<ea_year>\d{4})\))',
+    re.IGNORECASE
+)
+
+# Figure/Table patterns - only match caption definitions (not references)
+# Caption definitions typically start a new line or are preceded by blank lines
+_FIGURE_PATTERNS = {
+    'figure': re.compile(r'\n\s*(?:Figure|Fig\.?)\s*(\d+(?:\.\d+)?)[:\.]\s*(.+?)(?=\n\s*(?:Figure|Table|Fig\.?|Tab\.?)\s*\d|$)', re.IGNORECASE | re.DOTALL),
+    'table': re.compile(r'\n\s*(?:Table|Tab\.?)\s*(\d+(?:\.\d+)?)[:\.]\s*(.+?)(?=\n\s*(?:Figure|Table|Fig\.?|Tab\.?)\s*\d|$)', re.IGNORECASE | re.DOTALL)
+}
+
+# Cheap substring probes gating the DOTALL caption scans above, run against
+# a lowercased copy of the text: every spelling the IGNORECASE patterns
+# accept ("Figure", "fig.", "TAB 2", mixed case) contains these once
+# lowered, so a probe miss proves the full regex pass cannot match.
+_FIGURE_PROBES = {
+    'figure': 'fig',
+    'table': 'tab',
+}
+
+# Mathematical content patterns combined into one alternation so the
+# document is scanned once; alternative order keeps the original
+# priority (display -> numbered -> inline -> simple), and a single
+# pass can't produce the overlapping display/inline duplicates the
+# old per-pattern passes had to filter out.
+_MATH_PATTERN = re.compile(
+    r'\$\$(?P<display_math>[^$]+)\$\$'
+    r'|\\begin\{equation\}(?P<numbered_equation>.*?)\\end\{equation\}'
+    r'|\$(?!\$)(?P<inline_math>[^$]+)\$(?!\$)'
+    # Only match self-contained single-line equations, not fragments
+    r'|(?:^|\n)\s*(?P<simple_equation>[a-zA-Z]\s*[=<>≤≥≠≈]\s*[^,\n]+?)(?=\s*(?:,|\n\n|[A-Z][a-z]|$))',
+    re.DOTALL | re.MULTILINE
+)
+
+# Section heading patterns combined into one alternation: "1. TITLE",
+# "1.1 TITLE", and bare all-caps lines resolve in a single pass per
+# page instead of three findall sweeps
+_HEADING_PATTERN = re.compile(
+    r'^(?:\d+(?:\.\d+|\.)?\s+(?P<numbered>[A-Z][^a-z]*(?:\s+[A-Z][^a-z]*)*)'
+    r'|(?P<allcaps>[A-Z][A-Z\s]+$))',
+    re.MULTILINE
+)
+
+# Reference-section patterns. Bracketed and dotted numbering share one
+# alternation so each line costs a single match; the bracket-only probe
+# stays separate because the heading-stop check must not treat
+# "3. RESULTS" as a reference.
+_REF_HEADING_RE = re.compile(r'^\s*(references|bibliography)\s*$', re.IGNORECASE)
+_REF_BRACKET_RE = re.compile(r'^\s*\[(\d+)\]\s*(.+)')
+_REF_NUM_RE = re.compile(r'^\s*(?:\[(\d+)\]\s*|(\d+)[\.\)]\s+)(.+)')
+
+# Keyword-extraction tokenizer and acronym patterns, compiled once; both run
+# over every candidate text pool (title, abstract, intro, conclusion, body)
+_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9\-]+")
+_ACRONYM_RE = re.compile(r'\b[A-Z]{2,}(?:[A-Z\d]+)?\b')
+
+# Author-declared keyword headers ("Keywords:", "Index Terms:", ...), fused
+# into one alternation so a single scan over the full text replaces the
+# per-line, three-pattern walk. The dot stops at newlines, so each match
+# captures exactly the remainder of its header line.
+_DECLARED_KW_RE = re.compile(
+    r'\b(?:keywords?|index\s+terms?|key\s+phrases?)\s*[:\-]\s*(.+)',
+    re.IGNORECASE,
+)
+_KW_SPLIT_RE = re.compile(r'[;,]')
+
+# Keyword-normalization helpers, compiled once instead of inside the
+# per-candidate normalize path
+_WS_RE = re.compile(r'\s+')
+_NONALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+# Structural probes used by the equation-summary cascade, compiled once so
+# each equation costs pattern executions only, not re-cache lookups
+_EQ_CROSS_ENTROPY_RE = re.compile(r'-?\sum.*y\s*log\s*p')
+_EQ_KL_RE = re.compile(r'kl\s*\(')
+_EQ_ARG_OPT_RE = re.compile(r'arg\s*(?:min|max)')
+_EQ_SOFTMAX_RE = re.compile(r'e\^[^/]+/\s*\sum')
+_EQ_DERIVATIVE_RE = re.compile(r'd[^\s]/d[^\s]')
+
+# Keyword groups for the equation-summary cascade, fused into one alternation
+# so each input string is scanned once at C level instead of once per keyword.
+# The cascade only needs to know WHICH groups occur, so the alternation is
+# wrapped in a lookahead: every match is zero-width and the scan advances one
+# character at a time, which keeps overlapping terms from shadowing each other
+# (e.g. the single-character 'v' probe inside longer words). Terms that are
+# strict supersets of a same-group term ('d_kl', 'qk^t', 'p(y|x)',
+# 'convolution') are dropped as redundant.
+_EQ_TERM_GROUPS = (
+    ('xent', ('cross-entropy', 'cross entropy', 'log-likelihood', 'log likelihood')),
+    ('kl', ('kl',)),
+    ('softmax', ('softmax',)),
+    ('attn', ('qk', 'q·k', 'v', 'attention')),
+    ('grad', ('∇', 'nabla', 'gradient', '∂', 'partial')),
+    ('constr', ('constraint', 'subject to', 's.t.')),
+    ('metric', ('f1', 'precision', 'recall', 'auc', 'iou', 'bleu', 'rouge')),
+    ('prob', ('p(', 'posterior', 'prior', 'bayes')),
+    ('norm', ('||', 'norm', 'l1', 'l2', 'λ', 'lambda')),
+    ('conv', ('conv', 'kernel')),
+)
+_EQ_TERM_RE = re.compile(
+    '(?=(?:' + '|'.join(
+        '(?P<%s>%s)' % (tag, '|'.join(map(re.escape, terms)))
+        for tag, terms in _EQ_TERM_GROUPS
+    ) + '))'
+)
+
+
 class AdvancedPDFParser:
     """Enhanced PDF parser with advanced text processing capabilities"""
-    
+
     def __init__(self):
-        # Citation patterns
-        self.citation_patterns = {
-            'author_year': re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s*\((\d{4})\)', re.IGNORECASE),
-            'numbered': re.compile(r'\[(\d{1,3}(?:,\s*\d{1,3})*)\]'),  # More reasonable citation numbers (1-999)
-            'footnote': re.compile(r'\^(\d+)\b'),
-            'et_al': re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+et\s+al\.?\s*\((\d{4})\)', re.IGNORECASE)
-        }
-        
-        # Figure/Table patterns - only match caption definitions (not references)
-        # Caption definitions typically start a new line or are preceded by blank lines
-        self.figure_patterns = {
-            'figure': re.compile(r'\n\s*(?:Figure|Fig\.?)\s*(\d+(?:\.\d+)?)[:\.]\s*(.+?)(?=\n\s*(?:Figure|Table|Fig\.?|Tab\.?)\s*\d|$)', re.IGNORECASE | re.DOTALL),
-            'table': re.compile(r'\n\s*(?:Table|Tab\.?)\s*(\d+(?:\.\d+)?)[:\.]\s*(.+?)(?=\n\s*(?:Figure|Table|Fig\.?|Tab\.?)\s*\d|$)', re.IGNORECASE | re.DOTALL)
-        }
-        
-        # Mathematical content patterns (ordered by priority: display -> numbered -> inline -> simple)
-        self.math_patterns = [
-            ('display_math', re.compile(r'\$\$([^$]+)\$\$', re.DOTALL)),
-            ('numbered_equation', re.compile(r'\\begin\{equation\}(.*?)\\end\{equation\}', re.DOTALL)),
-            ('inline_math', re.compile(r'\$(?!\$)([^$]+)\$(?!\$)', re.DOTALL)),
-            # Only match self-contained single-line equations, not fragments
-            ('simple_equation', re.compile(r'(^|\n)\s*([a-zA-Z]\s*[=<>≤≥≠≈]\s*[^,\n]+?)(?=\s*(?:,|\n\n|[A-Z][a-z]|$))', re.MULTILINE)),
-        ]
+        # Patterns live at module scope so they compile once per process;
+        # instances (some services construct one per request) just bind them
+        self.citation_pattern = _CITATION_PATTERN
+        self.figure_patterns = _FIGURE_PATTERNS
+        self.math_pattern = _MATH_PATTERN
+        self.heading_pattern = _HEADING_PATTERN
+        self._ref_heading_re = _REF_HEADING_RE
+        self._ref_bracket_re = _REF_BRACKET_RE
+        self._ref_num_re = _REF_NUM_RE
+        self.keyword_stop_words = _STOP_WORDS
+
+    def _open_document(self, pdf_source) -> "fitz.Document":
+        """Open a PDF from a filesystem path or from in-memory bytes"""
+        if isinstance(pdf_source, (bytes, bytearray)):
+            return fitz.open(stream=pdf_source, filetype="pdf")
+        if not Path(pdf_source).exists():
+            raise FileNotFoundError(f"File {pdf_source} not found.")
+        return fitz.open(pdf_source)
+
+    def extract_text_with_layout(self, pdf_source) -> Dict:
+        """Extract text with layout information for advanced processing.
+
+        Accepts a path or raw PDF bytes, so callers that already hold the
+        upload in memory can skip the disk round-trip.
+        """
+        doc = self._open_document(pdf_source)
+        page_count = doc.page_count
+
+        # Shard long path-based documents across worker processes; bytes
+        # inputs would have to be re-pickled per worker, and a parse worker
+        # never nests another pool inside itself
+        if (
+            isinstance(pdf_source, str)
+            and page_count >= _MIN_PAGES_FOR_POOL
+            and not _in_parse_worker
+        ):
+            doc.close()
+            records = self._extract_pages_parallel(pdf_source, page_count)
+        else:
+            records = [
+                _extract_page_record(page, page_num)
+                for page_num, page in enumerate(doc)
+            ]
+            doc.close()
 
-        self.keyword_stop_words = {
-            'a', 'an', 'the', 'and', 'or', 'but', 'if', 'then', 'else', 'when', 'while', 'where',
-            'with', 'without', 'within', 'between', 'among', 'into', 'onto', 'through', 'across',
-            'from', 'into', 'over', 'under', 'above', 'below', 'around', 'about', 'before', 'after',
-            'first', 'second', 'third', 'fourth', 'fifth', 'last', 'former', 'latter', 'new', 'old',
-            'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten', 'per',
-            'each', 'every', 'many', 'several', 'various', 'other', 'another', 'any', 'all', 'both',
-            'few', 'more', 'most', 'some', 'such', 'same', 'different', 'similar', 'varied',
-            'we', 'you', 'they', 'he', 'she', 'it', 'our', 'your', 'their', 'its', 'his', 'her',
-            'who', 'whom', 'whose', 'which', 'that', 'this', 'these', 'those', 'there', 'here',
-            'been', 'being', 'was', 'were', 'are', 'is', 'am', 'be', 'have', 'has', 'had', 'having',
-            'do', 'does', 'did', 'doing', 'also', 'however', 'therefore', 'furthermore', 'moreover',
-            'because', 'since', 'although', 'though', 'whereas', 'yet', 'besides', 'overall',
-            'research', 'paper', 'study', 'article', 'work', 'result', 'results', 'finding',
-            'findings', 'approach', 'approaches', 'method', 'methods', 'analysis', 'data', 'dataset',
-            'datasets', 'model', 'models', 'system', 'systems', 'figure', 'figures', 'table', 'tables',
-            'section', 'sections', 'introduction', 'related', 'work', 'conclusion', 'discussion',
-            'abstract', 'summary', 'contributions', 'overview', 'proposed', 'presented', 'including',
-            'via', 'based', 'using', 'use', 'used', 'according', 'towards', 'toward', 'across',
-            'amongst', 'throughout', 'towards', 'across', 'whose', 'whereby', 'whichever', 'whenever'
-        }
-    
-    def extract_text_with_layout(self, pdf_path: str) -> Dict:
-        """Extract text with layout information for advanced processing"""
-        if not Path(pdf_path).exists():
-            raise FileNotFoundError(f"File {pdf_path} not found.")
-        
-        doc = fitz.open(pdf_path)
-        full_text = ""
-        page_texts = []
-        
-        for page_num, page in enumerate(doc):
-            page_text = page.get_text()
-            page_texts.append({
-                'page_number': page_num + 1,
+        page_texts = [
+            {
+                'page_number': page_number,
                 'text': page_text,
-                'blocks': page.get_text("dict")["blocks"]
-            })
-            full_text += page_text + "\n"
-        
-        doc.close()
-        
+                # Measured once here so position-to-page lookups don't
+                # re-derive every page length on each extraction pass
+                '_len': len(page_text),
+                'blocks': blocks,
+            }
+            for page_number, page_text, blocks in records
+        ]
+        # Single join instead of quadratic += concatenation; the one-newline
+        # separator is what _page_offsets assumes when mapping positions back
+        # to pages
+        full_text = "\n".join(record[1] for record in records)
+
         # Extract title and headings
         title = self._extract_title(page_texts)
         headings = self._extract_headings(page_texts)
@@ -119,16 +361,27 @@ class AdvancedPDFParser:
             'title': title,
             'headings': headings
         }
-    
+
+    def _extract_pages_parallel(self, pdf_path: str, page_count: int) -> List[tuple]:
+        """Extract all pages by sharding contiguous ranges across processes"""
+        workers = min(os.cpu_count() or 1, _SHARD_WORKERS)
+        shard_size = math.ceil(page_count / workers)
+        starts = range(0, page_count, shard_size)
+        stops = [min(start + shard_size, page_count) for start in starts]
+        with ProcessPoolExecutor(max_workers=len(stops), initializer=mark_parse_worker) as pool:
+            shards = pool.map(_extract_page_shard, repeat(pdf_path), starts, stops)
+            # map yields shards in submission order, so pages come back sorted
+            return [record for shard in shards for record in shard]
+
     def _extract_title(self, page_texts: List[Dict]) -> str:
         """Extract the paper title from the first page"""
         if not page_texts:
-            print("DEBUG - No page texts available")
+            logger.debug("No page texts available")
             return "Unknown Title"
-        
+
         first_page = page_texts[0]
         blocks = first_page.get('blocks', [])
-        print(f"DEBUG - Found {len(blocks)} blocks in first page")
+        logger.debug("Found %d blocks in first page", len(blocks))
         
         # Look for the largest font size text in the first few blocks (likely the title)
         title_candidates = []
@@ -139,100 +392,114 @@ class AdvancedPDFParser:
                     for span in line.get("spans", []):
                         text = span.get("text", "").strip()
                         font_size = span.get("size", 0)
-                        
-                        # Title characteristics: large font, short lines, first few blocks
-                        # Exclude arXiv identifiers, dates, and metadata
-                        excluded_patterns = [
-                            'abstract', 'introduction', 'arxiv:', 'submitted', 'received', 
-                            'accepted', 'published', 'volume', 'issue', 'doi:', 'issn:',
-                            'proceedings', 'conference', 'journal', 'workshop', 'symposium'
-                        ]
-                        
-                        is_excluded = any(text.lower().startswith(pattern) for pattern in excluded_patterns)
-                        has_date = any(char.isdigit() for char in text) and any(month in text.lower() for month in ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'])
-                        has_arxiv_id = 'arxiv:' in text.lower() or '[cs.' in text.lower() or 'v1' in text.lower()
-                        
-                        if (font_size >= 12 and len(text) > 10 and 
-                            len(text) < 200 and not is_excluded and 
-                            not has_date and not has_arxiv_id):
+
+                        # Title characteristics: large font, short lines,
+                        # first few blocks. The numeric gates are checked
+                        # first so body-text spans skip the string probes
+                        if font_size < 12 or not 10 < len(text) < 200:
+                            continue
+
+                        # Exclude arXiv identifiers, dates, and metadata;
+                        # lowercase once and reuse it for every probe
+                        text_lower = text.lower()
+                        is_excluded = text_lower.startswith(_SPAN_EXCLUDED_PREFIXES)
+                        has_date = any(char.isdigit() for char in text) and any(month in text_lower for month in _MONTH_NAMES)
+                        has_arxiv_id = 'arxiv:' in text_lower or '[cs.' in text_lower or 'v1' in text_lower
+
+                        if not is_excluded and not has_date and not has_arxiv_id:
                             title_candidates.append((text, font_size))
-                            print(f"DEBUG - Title candidate: '{text}' (font size: {font_size})")
+                            logger.debug("Title candidate: '%s' (font size: %s)", text, font_size)
                         else:
-                            print(f"DEBUG - Excluded candidate: '{text}' (excluded: {is_excluded}, has_date: {has_date}, has_arxiv: {has_arxiv_id})")
+                            logger.debug("Excluded candidate: '%s' (excluded: %s, has_date: %s, has_arxiv: %s)",
+                                         text, is_excluded, has_date, has_arxiv_id)
         
         # Return the text with the largest font size
         if title_candidates:
             title_candidates.sort(key=lambda x: x[1], reverse=True)
             selected_title = title_candidates[0][0]
-            print(f"DEBUG - Selected title from candidates: '{selected_title}'")
+            logger.debug("Selected title from candidates: '%s'", selected_title)
             return selected_title
         
         # Fallback: look for the first substantial line of text
         first_page_text = first_page.get('text', '')
         lines = [line.strip() for line in first_page_text.split('\n') if line.strip()]
-        print(f"DEBUG - First page text lines: {lines[:10]}")  # Show more lines for debugging
-        
-        # Try multiple approaches
-        for approach in ['first_line', 'longest_line', 'pattern_match']:
-            if approach == 'first_line':
-                # First approach: take the first substantial line
-                for line in lines[:5]:
-                    if self._is_valid_title(line):
-                        print(f"DEBUG - Selected title from first line approach: '{line}'")
-                        return line
-            
-            elif approach == 'longest_line':
-                # Second approach: take the longest line in first 10 lines
-                candidate_lines = [line for line in lines[:10] 
-                                 if self._is_valid_title(line) and len(line) > 20]
-                if candidate_lines:
-                    longest_line = max(candidate_lines, key=len)
-                    print(f"DEBUG - Selected title from longest line approach: '{longest_line}'")
-                    return longest_line
-            
-            elif approach == 'pattern_match':
-                # Third approach: look for title-like patterns
-                for line in lines[:10]:
-                    if (self._is_valid_title(line) and len(line) > 15 and len(line) < 150 and 
-                        any(word in line.lower() for word in ['analysis', 'study', 'method', 'approach', 'system', 'model', 'framework', 'learning', 'algorithm', 'neural', 'deep', 'machine'])):
-                        print(f"DEBUG - Selected title from pattern match approach: '{line}'")
-                        return line
-        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("First page text lines: %s", lines[:10])
+
+        # Lowercase and validate each candidate line exactly once; the three
+        # approaches below re-examine the same ten lines, and validation was
+        # previously repeated (with fresh lowercase allocations) per approach
+        candidates = [(line, line.lower()) for line in lines[:10]]
+        validity = [
+            self._is_valid_title(line, line_lower)
+            for line, line_lower in candidates
+        ]
+
+        # First approach: take the first substantial line
+        for (line, _), is_valid in zip(candidates[:5], validity):
+            if is_valid:
+                logger.debug("Selected title from first line approach: '%s'", line)
+                return line
+
+        # Second approach: take the longest line in first 10 lines
+        candidate_lines = [
+            line for (line, _), is_valid in zip(candidates, validity)
+            if is_valid and len(line) > 20
+        ]
+        if candidate_lines:
+            longest_line = max(candidate_lines, key=len)
+            logger.debug("Selected title from longest line approach: '%s'", longest_line)
+            return longest_line
+
+        # Third approach: look for title-like patterns
+        for (line, line_lower), is_valid in zip(candidates, validity):
+            if (is_valid and 15 < len(line) < 150 and
+                any(word in line_lower for word in _TITLE_KEYWORDS)):
+                logger.debug("Selected title from pattern match approach: '%s'", line)
+                return line
+
         # Final fallback: Use AI to extract title from first page text
-        print("DEBUG - Trying AI-based title extraction")
+        logger.debug("Trying AI-based title extraction")
         return self._extract_title_with_ai(first_page_text)
     
-    def _is_valid_title(self, text: str) -> bool:
-        """Check if a text line is a valid paper title"""
+    def _is_valid_title(self, text: str, text_lower: Optional[str] = None) -> bool:
+        """Check if a text line is a valid paper title.
+
+        Callers that already hold the lowercased line pass it in so it isn't
+        re-allocated here.
+        """
         if not text or len(text) < 10 or len(text) > 200:
             return False
-        
-        text_lower = text.lower()
-        
-        # Exclude common non-title patterns
-        excluded_patterns = [
-            'abstract', 'introduction', 'author', 'university', 'journal', 'proceedings',
-            'conference', 'workshop', 'symposium', 'arxiv:', 'submitted', 'received',
-            'accepted', 'published', 'volume', 'issue', 'doi:', 'issn:', 'email:',
-            'address:', 'department', 'institute', 'college', 'school'
-        ]
-        
-        # Check if starts with excluded patterns
-        if any(text_lower.startswith(pattern) for pattern in excluded_patterns):
+
+        if text_lower is None:
+            text_lower = text.lower()
+
+        # Check if starts with excluded (common non-title) patterns
+        if text_lower.startswith(_TITLE_EXCLUDED_PREFIXES):
             return False
         
         # Exclude lines with arXiv identifiers
         if 'arxiv:' in text_lower or '[cs.' in text_lower or 'v1' in text_lower or 'v2' in text_lower:
             return False
         
+        # One pass over the characters picks up both the digit flag (for the
+        # date check) and the alphanumeric count (for the mostly-symbols
+        # check), instead of walking the line twice and building a throwaway
+        # list
+        has_digit = False
+        alnum_count = 0
+        for char in text:
+            if char.isalnum():
+                alnum_count += 1
+                if not has_digit and char.isdigit():
+                    has_digit = True
+
         # Exclude lines with dates (contain digits and month names)
-        has_digit = any(char.isdigit() for char in text)
-        has_month = any(month in text_lower for month in ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'])
-        if has_digit and has_month:
+        if has_digit and any(month in text_lower for month in _MONTH_NAMES):
             return False
-        
+
         # Exclude lines that are mostly numbers or special characters
-        if len([c for c in text if c.isalnum()]) < len(text) * 0.7:
+        if alnum_count < len(text) * 0.7:
             return False
         
         # Exclude very short words (likely metadata)
@@ -253,7 +520,7 @@ class AdvancedPDFParser:
             api_key = os.getenv("OPENAI_API_KEY")
             
             if not api_key:
-                print("DEBUG - No OpenAI API key found")
+                logger.debug("No OpenAI API key found")
                 return "Unknown Title"
             
             # Truncate text to avoid token limits
@@ -292,18 +559,21 @@ class AdvancedPDFParser:
             if response.status_code == 200:
                 data = response.json()
                 title = data["choices"][0]["message"]["content"].strip()
-                print(f"DEBUG - AI extracted title: '{title}'")
+                logger.debug("AI extracted title: '%s'", title)
                 return title if title and len(title) > 5 else "Unknown Title"
             else:
-                print(f"DEBUG - AI title extraction failed: {response.status_code}")
+                logger.debug("AI title extraction failed: %s", response.status_code)
                 return "Unknown Title"
-                
+
         except Exception as e:
-            print(f"DEBUG - AI title extraction error: {e}")
+            logger.debug("AI title extraction error: %s", e)
             return "Unknown Title"
     
     def _extract_title_from_filename(self, pdf_path: str) -> str:
         """Extract title from PDF filename as last resort"""
+        if not isinstance(pdf_path, str):
+            # In-memory PDFs have no filename to fall back on
+            return "Unknown Title"
         try:
             from pathlib import Path
             filename = Path(pdf_path).stem  # Get filename without extension
@@ -320,97 +590,83 @@ class AdvancedPDFParser:
             
             # Check if it's a reasonable title
             if len(title) > 10 and len(title) < 200:
-                print(f"DEBUG - Extracted title from filename: '{title}'")
+                logger.debug("Extracted title from filename: '%s'", title)
                 return title
             else:
                 return "Unknown Title"
-                
+
         except Exception as e:
-            print(f"DEBUG - Filename title extraction error: {e}")
+            logger.debug("Filename title extraction error: %s", e)
             return "Unknown Title"
     
     def _extract_headings(self, page_texts: List[Dict]) -> List[Dict]:
         """Extract section headings from all pages"""
         headings = []
-        
-        # Common heading patterns
-        heading_patterns = [
-            re.compile(r'^\d+\.?\s+([A-Z][^a-z]*(?:\s+[A-Z][^a-z]*)*)', re.MULTILINE),  # "1. INTRODUCTION"
-            re.compile(r'^([A-Z][A-Z\s]+)$', re.MULTILINE),  # "INTRODUCTION"
-            re.compile(r'^\d+\.\d+\s+([A-Z][^a-z]*(?:\s+[A-Z][^a-z]*)*)', re.MULTILINE),  # "1.1 INTRODUCTION"
-        ]
-        
+
         for page in page_texts:
             page_num = page.get('page_number', 1)
             text = page.get('text', '')
-            
-            for pattern in heading_patterns:
-                matches = pattern.findall(text)
-                for match in matches:
-                    heading_text = match.strip()
-                    # Filter out likely false positives
-                    if (len(heading_text) > 3 and len(heading_text) < 100 and
-                        not heading_text.lower() in ['abstract', 'references', 'bibliography']):
-                        headings.append({
-                            'text': heading_text,
-                            'page': page_num,
-                            'type': 'section_heading'
-                        })
+
+            # One combined-pattern scan per page; numbered headings and bare
+            # all-caps lines never overlap, so no cross-pattern dedup needed
+            for match in self.heading_pattern.finditer(text):
+                heading_text = (match.group('numbered') or match.group('allcaps')).strip()
+                # Filter out likely false positives
+                if (len(heading_text) > 3 and len(heading_text) < 100 and
+                    not heading_text.lower() in ['abstract', 'references', 'bibliography']):
+                    headings.append({
+                        'text': heading_text,
+                        'page': page_num,
+                        'type': 'section_heading'
+                    })
         
         return headings
     
     def extract_citations(self, text: str) -> List[Citation]:
-        """Extract citations from the text"""
+        """Extract citations from the text in a single combined-pattern scan"""
         citations = []
-        
-        for citation_type, pattern in self.citation_patterns.items():
-            for match in pattern.finditer(text):
-                citation_text = match.group(0)
-                position = match.start()
-                
-                # Filter out likely false positives
-                if citation_type == 'numbered':
-                    citation_number = match.group(1)
-                    # Skip very large numbers that are likely years or other data
-                    if int(citation_number.split(',')[0]) > 999:
-                        continue
-                
-                if citation_type == 'numbered':
-                    citation_numbers = [
-                        int(num.strip())
-                        for num in match.group(1).split(',')
-                        if num.strip().isdigit()
-                    ]
-                    # Skip bracketed sequences that clearly aren't citations, e.g., contain 0
-                    if not citation_numbers or any(num <= 0 for num in citation_numbers):
-                        continue
-                    authors = None
-                    year = None
-                    title = None
-                elif citation_type == 'author_year':
-                    authors = [match.group(1)]
-                    year = match.group(2)
-                    title = None
-                elif citation_type == 'footnote':
-                    authors = None
-                    year = None
-                    title = None
-                elif citation_type == 'et_al':
-                    authors = [match.group(1)]
-                    year = match.group(2)
-                    title = None
-                
-                citation = Citation(
-                    text=citation_text,
-                    position=position,
-                    citation_type=citation_type,
-                    authors=authors or [],
-                    year=year,
-                    title=title
-                )
-                citations.append(citation)
-        
-        return sorted(citations, key=lambda x: x.position)
+
+        for match in self.citation_pattern.finditer(text):
+            # span() avoids materializing the matched string up front; the
+            # slice below only happens for matches that survive the numbered
+            # zero-filter, which rejects most false positives
+            start, end = match.span()
+            authors = None
+            year = None
+
+            if match.group('numbered') is not None:
+                citation_type = 'numbered'
+                citation_numbers = [
+                    int(num.strip())
+                    for num in match.group('num_list').split(',')
+                    if num.strip().isdigit()
+                ]
+                # Skip bracketed sequences that clearly aren't citations, e.g., contain 0
+                if not citation_numbers or any(num <= 0 for num in citation_numbers):
+                    continue
+            elif match.group('author_year') is not None:
+                citation_type = 'author_year'
+                authors = [match.group('ay_authors')]
+                year = match.group('ay_year')
+            elif match.group('footnote') is not None:
+                citation_type = 'footnote'
+            else:
+                citation_type = 'et_al'
+                authors = [match.group('ea_authors')]
+                year = match.group('ea_year')
+
+            citation = Citation(
+                text=text[start:end],
+                position=start,
+                citation_type=citation_type,
+                authors=authors or [],
+                year=year,
+                title=None
+            )
+            citations.append(citation)
+
+        citations.sort(key=lambda x: x.position)
+        return citations
 
     def extract_references(self, text: str) -> Dict[int, str]:
         """Extract numbered references from the references section"""
@@ -420,15 +676,11 @@ class AdvancedPDFParser:
         current_number: Optional[int] = None
         current_parts: List[str] = []
 
-        reference_heading_pattern = re.compile(r'^\s*(references|bibliography)\s*$', re.IGNORECASE)
-        numbered_bracket_pattern = re.compile(r'^\s*\[(\d+)\]\s*(.+)')
-        numbered_dot_pattern = re.compile(r'^\s*(\d+)[\.\)]\s+(.+)')
-
         for raw_line in lines:
             line = raw_line.strip()
 
             if not collecting:
-                if reference_heading_pattern.match(line):
+                if self._ref_heading_re.match(line):
                     collecting = True
                 continue
 
@@ -440,20 +692,22 @@ class AdvancedPDFParser:
                 continue
 
             # Detect next heading (all caps words) to stop collecting
-            if line.isupper() and len(line.split()) <= 6 and not numbered_bracket_pattern.match(line):
+            if line.isupper() and len(line.split()) <= 6 and not self._ref_bracket_re.match(line):
                 if current_number is not None and current_parts:
                     references[current_number] = ' '.join(current_parts).strip()
                 break
 
-            match = numbered_bracket_pattern.match(line) or numbered_dot_pattern.match(line)
+            match = self._ref_num_re.match(line)
 
             if match:
                 if current_number is not None and current_parts:
                     references[current_number] = ' '.join(current_parts).strip()
 
                 try:
-                    current_number = int(match.group(1))
-                    current_parts = [match.group(2).strip()]
+                    current_number = int(match.group(1) or match.group(2))
+                    # The body needs no per-line strip: lines are already
+                    # stripped, and the join result is stripped on flush
+                    current_parts = [match.group(3)]
                 except ValueError:
                     current_number = None
                     current_parts = []
@@ -466,118 +720,129 @@ class AdvancedPDFParser:
 
         return references
     
-    def extract_figures_tables(self, text: str, pages: List[Dict], pdf_path: str = None) -> List[FigureTable]:
+    def _page_offsets(self, pages: List[Dict]) -> List[int]:
+        """Cumulative end offset of each page's text in the joined full text.
+
+        Built once per extraction so page lookups become a binary search
+        instead of re-walking every page for every match.
+        """
+        offsets = []
+        total = 0
+        for page_info in pages:
+            # '_len' is stamped at extraction time; fall back for page dicts
+            # assembled outside extract_text_with_layout
+            total += page_info.get('_len') or len(page_info['text'])
+            offsets.append(total)
+            total += 1  # the newline joining consecutive pages
+        return offsets
+
+    def _page_number_at(self, position: int, pages: List[Dict], offsets: List[int]) -> int:
+        """Map a character position in the full text to its page number"""
+        idx = bisect_right(offsets, position)
+        if idx >= len(pages):
+            return 1
+        return pages[idx]['page_number']
+
+    def extract_figures_tables(self, text: str, pages: List[Dict], pdf_source=None) -> List[FigureTable]:
         """Extract figures and tables with their captions and images"""
         figures_tables = []
         seen_labels = set()  # Track labels to avoid duplicates
-        
+        offsets = self._page_offsets(pages)
+
+        # Lowered once and shared by both probes; one linear pass is far
+        # cheaper than the DOTALL scans it can rule out
+        text_lower = text.lower()
         for content_type, pattern in self.figure_patterns.items():
+            # Skip the expensive DOTALL scan outright when no caption keyword
+            # appears anywhere in the document
+            if _FIGURE_PROBES[content_type] not in text_lower:
+                continue
             for match in pattern.finditer(text):
                 label = f"{content_type.title()} {match.group(1)}"
                 position = match.start()
                 
                 # Skip if we've already seen this exact label
                 if label in seen_labels:
-                    print(f"DEBUG: Skipping duplicate {label} at position {position}")
+                    logger.debug("Skipping duplicate %s at position %d", label, position)
                     continue
                 seen_labels.add(label)
-                print(f"DEBUG: Processing new {label} at position {position}")
+                logger.debug("Processing new %s at position %d", label, position)
                 
                 caption = match.group(2).strip()
                 
                 # Skip if caption is too short (likely just a reference, not a definition)
                 if len(caption) < 20:  # Real figure captions are usually longer
-                    print(f"DEBUG: Skipping short caption for {label}: '{caption[:50]}'")
+                    logger.debug("Skipping short caption for %s: '%s'", label, caption[:50])
                     continue
                 
                 # Find which page this content is on
-                page_number = 1
-                current_pos = 0
-                for page_info in pages:
-                    if position < current_pos + len(page_info['text']):
-                        page_number = page_info['page_number']
-                        break
-                    current_pos += len(page_info['text']) + 1
-                
-                # Extract image from the page
-                image_base64 = None
-                if pdf_path:
-                    image_base64 = self._extract_page_image(pdf_path, page_number)
-                
+                page_number = self._page_number_at(position, pages, offsets)
+
                 figure_table = FigureTable(
                     caption=caption,
                     label=label,
                     content_type=content_type,
                     position=position,
-                    page_number=page_number,
-                    image_base64=image_base64
+                    page_number=page_number
                 )
                 figures_tables.append(figure_table)
+
+        # Fetch the page images in one batch after the scan, so path-based
+        # documents can fan the rendering out across worker processes
+        if pdf_source is not None and figures_tables:
+            page_images = self._extract_page_images_bulk(
+                pdf_source, [item.page_number for item in figures_tables]
+            )
+            for item in figures_tables:
+                item.image_base64 = page_images.get(item.page_number)
         
-        return sorted(figures_tables, key=lambda x: x.position)
+        figures_tables.sort(key=lambda x: x.position)
+        return figures_tables
     
     def extract_mathematical_content(self, text: str, pages: List[Dict]) -> List[MathematicalContent]:
-        """Extract mathematical content and equations"""
+        """Extract mathematical content and equations in one scan.
+
+        finditer never yields overlapping matches, so the single combined
+        pattern replaces both the four per-type passes and the Python-level
+        overlap bookkeeping the old code needed to deduplicate display vs
+        inline captures.
+        """
         math_content = []
-        
-        seen_ranges: List[Tuple[int, int]] = []
         seen_keys = set()
-        for equation_type, pattern in self.math_patterns:
-            for match in pattern.finditer(text):
-                # Handle groups - for simple_equation we have 2 groups
-                if len(match.groups()) > 1 and equation_type == 'simple_equation':
-                    equation = match.group(2).strip()
-                else:
-                    equation = match.group(1).strip()
-                
-                # Skip very short or likely non-equations
-                if len(equation) < 3:
-                    continue
-                
-                position = match.start()
-                end_pos = match.end()
+        offsets = self._page_offsets(pages)
 
-                # Skip if overlaps an already captured region (avoid duplicate capture of display vs inline)
-                overlaps = any(not (end_pos <= s or position >= e) for s, e in seen_ranges)
-                if overlaps:
-                    continue
-                
-                # Find which page this content is on
-                page_number = 1
-                current_pos = 0
-                for page_info in pages:
-                    if position < current_pos + len(page_info['text']):
-                        page_number = page_info['page_number']
-                        break
-                    current_pos += len(page_info['text']) + 1
-                
-                key = (equation, equation_type, page_number)
-                if key in seen_keys:
-                    continue
-                seen_keys.add(key)
+        for match in self.math_pattern.finditer(text):
+            equation_type = match.lastgroup
+            equation = match.group(equation_type).strip()
 
-                math_item = MathematicalContent(
-                    equation=equation,
-                    equation_type=equation_type,
-                    position=position,
-                    page_number=page_number
-                )
-                math_content.append(math_item)
-                seen_ranges.append((position, end_pos))
-        
-        return sorted(math_content, key=lambda x: x.position)
+            # Skip very short or likely non-equations
+            if len(equation) < 3:
+                continue
+
+            position = match.start()
+
+            # Find which page this content is on
+            page_number = self._page_number_at(position, pages, offsets)
+
+            key = (equation, equation_type, page_number)
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+
+            math_content.append(MathematicalContent(
+                equation=equation,
+                equation_type=equation_type,
+                position=position,
+                page_number=page_number
+            ))
+
+        math_content.sort(key=lambda x: x.position)
+        return math_content
 
     def _infer_topic_from_headings(self, position: int, pages: List[Dict], headings: List[Dict]) -> Optional[str]:
         """Infer the most relevant section heading occurring before the given position."""
-        # Map positions per page
-        current_pos = 0
-        position_page = 1
-        for page_info in pages:
-            page_len = len(page_info['text']) + 1
-            if position < current_pos + page_len:
-                position_page = page_info['page_number']
-                break
-            current_pos += page_len
+        # Map the position to its page
+        position_page = self._page_number_at(position, pages, self._page_offsets(pages))
         # Choose the latest heading on or before this page
         prior_headings = [h for h in headings if h.get('page', 0) <= position_page]
         if not prior_headings:
@@ -588,28 +853,40 @@ class AdvancedPDFParser:
 
     def _summarize_equation(self, equation: str, nearby_text: str) -> Tuple[str, str]:
         """Heuristically summarize what the equation means and its likely impact."""
-        eq = equation.strip()
+        return self._classify_equation(equation.strip(), nearby_text.lower())
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _classify_equation(eq: str, text_lower: str) -> Tuple[str, str]:
+        """Classify a normalized equation into a (meaning, impact) pair.
+
+        Papers repeat equations and share nearby phrasing, so the keyword
+        cascade is memoized on its normalized inputs; the bounded cache
+        absorbs duplicates for free.
+        """
         eq_lower = eq.lower()
-        text_lower = nearby_text.lower()
 
-        def contains(*terms: str) -> bool:
-            return any(t in eq_lower or t in text_lower for t in terms)
+        # One alternation pass per string collects every keyword group that
+        # occurs; the cascade below then runs on O(1) set lookups, keeping
+        # its original priority order
+        cats = {m.lastgroup for m in _EQ_TERM_RE.finditer(eq_lower)}
+        cats.update(m.lastgroup for m in _EQ_TERM_RE.finditer(text_lower))
 
         # Highly specific patterns first
         # Cross-entropy / log-likelihood
-        if contains('cross-entropy', 'cross entropy') or re.search(r'-?\sum.*y\s*log\s*p', eq_lower) or contains('log-likelihood', 'log likelihood'):
+        if 'xent' in cats or _EQ_CROSS_ENTROPY_RE.search(eq_lower):
             return (
                 "Cross-entropy/log-likelihood objective for fitting predicted distributions.",
                 "Improves classification performance and calibration by maximizing probability of true labels."
             )
         # KL divergence / information terms
-        if contains('kl', 'd_kl', 'dkl') or re.search(r'kl\s*\(', eq_lower):
+        if 'kl' in cats or _EQ_KL_RE.search(eq_lower):
             return (
                 "KL-divergence regularizer aligning two distributions.",
                 "Stabilizes training and steers solutions toward desired priors; improves generalization."
             )
         # Argmin/argmax objectives
-        if re.search(r'arg\s*(min|max)', eq_lower):
+        if _EQ_ARG_OPT_RE.search(eq_lower):
             return (
                 "Optimization objective defining the best parameters under the stated criterion.",
                 "Determines the learned solution; directly impacts accuracy and robustness."
@@ -621,48 +898,48 @@ class AdvancedPDFParser:
                 "Reduces overfitting, improving test performance at potential cost of bias."
             )
         # Softmax / attention-like scoring
-        if contains('softmax') or re.search(r'e\^[^/]+/\s*\sum', eq_lower):
+        if 'softmax' in cats or _EQ_SOFTMAX_RE.search(eq_lower):
             return (
                 "Softmax-based scoring/attention to weight alternatives.",
                 "Focuses the model on salient features; often boosts performance on structured tasks."
             )
-        if contains('qk', 'q·k', 'qk^t', 'v', 'attention'):
+        if 'attn' in cats:
             return (
                 "Attention mechanism computing relevance between query and key to weight values.",
                 "Improves representation of long-range dependencies; enhances accuracy and interpretability."
             )
         # Gradient / derivative updates
-        if contains('∇', 'nabla', 'gradient', '∂', 'partial') or re.search(r'd[^\s]/d[^\s]', eq_lower):
+        if 'grad' in cats or _EQ_DERIVATIVE_RE.search(eq_lower):
             return (
                 "Gradient/derivative relation governing parameter updates or sensitivities.",
                 "Affects convergence speed and stability; critical for achieving reported results."
             )
         # Constraints / bounds / inequalities
-        if any(sym in eq for sym in ['≤', '≥', '>=', '<=', '<', '>']) or contains('constraint', 'subject to', 's.t.'):
+        if any(sym in eq for sym in ['≤', '≥', '>=', '<=', '<', '>']) or 'constr' in cats:
             return (
                 "Constraint or bound restricting feasible solutions or establishing guarantees.",
                 "Improves robustness and safety; clarifies validity regime of the method."
             )
         # Metrics
-        if contains('f1', 'precision', 'recall', 'auc', 'iou', 'bleu', 'rouge'):
+        if 'metric' in cats:
             return (
                 "Evaluation metric defining how performance is measured.",
                 "Shapes optimization focus and reported improvements."
             )
         # Probabilistic relations
-        if contains('p(', 'p(y|x)', 'posterior', 'prior', 'bayes'):
+        if 'prob' in cats:
             return (
                 "Probabilistic relation modeling uncertainty or conditional dependence.",
                 "Improves calibration and decision-making under uncertainty."
             )
         # Norm-based regularization
-        if contains('||', 'norm', 'l1', 'l2', 'λ', 'lambda'):
+        if 'norm' in cats:
             return (
                 "Regularization term controlling parameter magnitude/complexity.",
                 "Reduces overfitting and improves generalization stability."
             )
         # Convolution / kernels
-        if contains('conv', 'convolution', 'kernel'):
+        if 'conv' in cats:
             return (
                 "Convolution/kernel operation extracting structured features.",
                 "Enables learning of spatial/temporal patterns; boosts representation quality."
@@ -696,63 +973,113 @@ class AdvancedPDFParser:
         end = min(len(text), position + window)
         return text[start:end]
     
-    def _extract_page_image(self, pdf_path: str, page_number: int) -> Optional[str]:
-        """Extract images from a specific page of the PDF and return the largest one as base64"""
+    def _extract_page_images_bulk(self, pdf_source, page_numbers: List[int]) -> Dict[int, Optional[str]]:
+        """Extract the representative image for each requested page.
+
+        Path inputs with several pages fan the rendering/decoding out across
+        worker processes (the pixmap and PNG work is native and per-page
+        independent); bytes inputs and single pages stay serial.
+        """
+        if not page_numbers:
+            return {}
+        # Papers routinely put several figures on one page; render each page
+        # once and let callers share the result through the returned mapping
+        unique_pages = sorted(set(page_numbers))
+        if (
+            isinstance(pdf_source, str)
+            and len(unique_pages) > 1
+            and not _in_parse_worker
+        ):
+            workers = min(os.cpu_count() or 1, _SHARD_WORKERS, len(unique_pages))
+            shards = [unique_pages[i::workers] for i in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers, initializer=mark_parse_worker) as pool:
+                results = pool.map(_extract_page_images_shard, repeat(pdf_source), shards)
+            return {number: image for shard in results for number, image in shard}
+        # Serial path: one shared document for the whole batch instead of a
+        # fresh open (and xref parse) per page
+        doc = self._open_document(pdf_source)
         try:
-            if not Path(pdf_path).exists():
-                return None
-            
-            doc = fitz.open(pdf_path)
-            if page_number < 1 or page_number > len(doc):
-                doc.close()
-                return None
-            
-            page = doc[page_number - 1]  # Convert to 0-based index
-            
-            # Try to extract embedded images from the page
-            image_list = page.get_images()
-            
-            print(f"DEBUG: Found {len(image_list)} embedded images on page {page_number}")
-            
-            if image_list:
-                # Try to find the largest image (likely the main figure/table)
-                largest_image = None
-                largest_size = 0
-                
-                for img in image_list:
-                    xref = img[0]
-                    try:
-                        base_image = doc.extract_image(xref)
-                        image_size = len(base_image["image"])
-                        if image_size > largest_size:
-                            largest_size = image_size
-                            largest_image = base_image
-                    except:
-                        continue
-                
-                if largest_image:
-                    image_bytes = largest_image["image"]
-                    # Convert to base64
-                    img_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                    doc.close()
-                    
-                    print(f"DEBUG: Extracted largest embedded image from page {page_number}, size: {largest_size} bytes")
-                    return img_base64
-                else:
-                    print(f"DEBUG: Could not extract embedded images, rendering full page")
-            else:
-                print(f"DEBUG: No embedded images found on page {page_number}, rendering full page")
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better quality
-            img_bytes = pix.tobytes("png")
-            
-            # Convert to base64
-            img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-            
+            return {
+                number: self._extract_page_image(pdf_source, number, doc=doc)
+                for number in unique_pages
+            }
+        finally:
             doc.close()
-            return img_base64
-            
+
+    def _extract_page_image(self, pdf_source, page_number: int, doc: Optional["fitz.Document"] = None) -> Optional[str]:
+        """Extract images from a specific page of the PDF and return the largest one as base64.
+
+        Callers extracting several pages pass an already-open ``doc`` so the
+        xref tables aren't re-parsed for every page; the document is only
+        opened (and closed) here when none is supplied.
+        """
+        owns_doc = doc is None
+        try:
+            if owns_doc:
+                doc = self._open_document(pdf_source)
+            try:
+                if page_number < 1 or page_number > len(doc):
+                    return None
+
+                page = doc[page_number - 1]  # Convert to 0-based index
+
+                # Enumerate embedded images without decoding them:
+                # get_image_info reads dimensions from the page's object
+                # tables, so only the winning image pays the extract_image
+                # decode instead of every candidate
+                image_infos = [
+                    info for info in page.get_image_info(xrefs=True)
+                    if info.get("xref", 0) > 0
+                ]
+
+                logger.debug("Found %d embedded images on page %d", len(image_infos), page_number)
+
+                if image_infos:
+                    # Largest pixel area first (likely the main figure/table);
+                    # fall through to the next candidate if an xref fails
+                    image_infos.sort(
+                        key=lambda info: info["width"] * info["height"],
+                        reverse=True
+                    )
+                    largest_image = None
+                    for info in image_infos:
+                        try:
+                            largest_image = doc.extract_image(info["xref"])
+                            break
+                        except:
+                            continue
+
+                    if largest_image:
+                        image_bytes = largest_image["image"]
+                        # Convert to base64
+                        img_base64 = base64.b64encode(image_bytes).decode('utf-8')
+
+                        logger.debug("Extracted largest embedded image from page %d, size: %d bytes",
+                                     page_number, len(image_bytes))
+                        return img_base64
+                    else:
+                        logger.debug("Could not extract embedded images, rendering full page")
+                else:
+                    logger.debug("No embedded images found on page %d, rendering full page", page_number)
+                # Scale the render to a target longest edge rather than a
+                # fixed 2x zoom, so page size no longer dictates pixmap
+                # size; alpha=False keeps the buffer RGB-only, which JPEG
+                # requires anyway
+                zoom = _RENDER_TARGET_PX / max(page.rect.width, page.rect.height, 1)
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                # JPEG skips PNG's zlib deflate -- several times faster to
+                # encode and a much smaller base64 payload, at quality
+                # that's fine for display/VLM consumption
+                img_bytes = pix.tobytes("jpeg", jpg_quality=85)
+
+                # Convert to base64
+                return base64.b64encode(img_bytes).decode('utf-8')
+            finally:
+                if owns_doc:
+                    doc.close()
+
         except Exception as e:
-            print(f"Error extracting image from page {page_number}: {str(e)}")
+            logger.debug("Error extracting image from page %d: %s", page_number, e)
             return None
     
     def extract_keywords(
@@ -768,7 +1095,7 @@ class AdvancedPDFParser:
 
         def normalize_keyword(keyword: str) -> str:
             """Create a normalized form for deduplication"""
-            return re.sub(r'\s+', ' ', re.sub(r'[^a-z0-9]+', ' ', keyword.lower())).strip()
+            return _WS_RE.sub(' ', _NONALNUM_RE.sub(' ', keyword.lower())).strip()
 
         def title_case_keyword(keyword: str) -> str:
             """Convert keyword to title case while preserving acronyms"""
@@ -781,7 +1108,6 @@ class AdvancedPDFParser:
                     title_cased.append(word.capitalize())
             return " ".join(title_cased)
 
-        pattern = re.compile(r"[A-Za-z][A-Za-z0-9\-]+")
         word_freq: Dict[str, float] = {}
         word_degree: Dict[str, float] = {}
         phrase_candidates: Dict[str, Dict[str, Any]] = {}
@@ -800,7 +1126,8 @@ class AdvancedPDFParser:
             if segment_len == 1 and len(token_pairs[0][0]) < 4:
                 return
 
-            phrase_lower = " ".join(tok[0] for tok in token_pairs)
+            token_lowers = tuple(tok[0] for tok in token_pairs)
+            phrase_lower = " ".join(token_lowers)
             letters_only = "".join(ch for ch in phrase_lower if ch.isalpha())
             if len(letters_only) < 4:
                 return
@@ -814,7 +1141,9 @@ class AdvancedPDFParser:
                     "weight": 0.0,
                     "length": segment_len,
                     "display": display_phrase,
-                    "count": 0
+                    "count": 0,
+                    # Kept so the score loop doesn't re-split the phrase
+                    "tokens": token_lowers
                 }
             )
 
@@ -832,18 +1161,17 @@ class AdvancedPDFParser:
             if not source_text:
                 return
 
-            tokens = [
-                (match.group(0).lower(), match.group(0))
-                for match in pattern.finditer(source_text)
-            ]
-
-            if not tokens:
-                return
-
+            # Stream tokens straight from the scanner instead of materializing
+            # an intermediate list: one linear pass per pool, no second walk.
+            # Binding the membership probe skips the attribute chain on every
+            # token of the hot loop.
+            is_stop_word = self.keyword_stop_words.__contains__
             current_phrase: List[tuple] = []
 
-            for token_lower, token_original in tokens:
-                if token_lower in self.keyword_stop_words or len(token_lower) < 3:
+            for match in _TOKEN_RE.finditer(source_text):
+                token_original = match.group(0)
+                token_lower = token_original.lower()
+                if is_stop_word(token_lower) or len(token_lower) < 3:
                     if current_phrase:
                         register_phrase(current_phrase, weight)
                         current_phrase = []
@@ -856,7 +1184,7 @@ class AdvancedPDFParser:
         def track_acronyms(source_text: str, weight: float = 1.0):
             if not source_text:
                 return
-            for match in re.finditer(r'\b[A-Z]{2,}(?:[A-Z\d]+)?\b', source_text):
+            for match in _ACRONYM_RE.finditer(source_text):
                 token = match.group(0)
                 if len(token) <= 2:  # skip trivial acronyms
                     continue
@@ -891,27 +1219,36 @@ class AdvancedPDFParser:
 
         phrase_scores: List[Tuple[str, float]] = []
         for phrase_lower, data in phrase_candidates.items():
-            tokens = phrase_lower.split()
-            token_scores = [word_scores.get(token, 0.0) for token in tokens]
-            score = sum(token_scores) * data["weight"] * (1.0 + 0.15 * (data["length"] - 1))
+            # Every phrase token was registered in word_freq, so the stored
+            # token tuple indexes word_scores directly — no re-split, no
+            # intermediate list, no missing-key fallback
+            score = sum(word_scores[token] for token in data["tokens"])
+            score *= data["weight"] * (1.0 + 0.15 * (data["length"] - 1))
             # Slight boost for phrases seen multiple times
             score *= math.log1p(data["count"] + 1)
             phrase_scores.append((phrase_lower, score))
 
-        ranked_keywords = sorted(
+        # Only the top candidates survive the dedup/limit pass below, so
+        # select with a bounded heap (O(N log K)) instead of sorting every
+        # phrase; the 4x over-pull leaves reserves for entries dropped as
+        # duplicates or over-long
+        ranked_keywords = heapq.nlargest(
+            max_keywords * 4,
             phrase_scores,
-            key=lambda item: item[1],
-            reverse=True
+            key=lambda item: item[1]
         )
 
         keywords: List[str] = []
         seen_keys: set = set()
 
-        def add_keyword(keyword: str):
+        def add_keyword(keyword: str, normalized: Optional[str] = None):
             token_count = len(keyword.split())
             if token_count == 0 or token_count > 3:
                 return False
-            normalized = normalize_keyword(keyword)
+            # Ranked phrases arrive with their dedup key already computed;
+            # only declared keywords and acronyms normalize here
+            if normalized is None:
+                normalized = normalize_keyword(keyword)
             if not normalized or normalized in seen_keys:
                 return False
             seen_keys.add(normalized)
@@ -926,12 +1263,15 @@ class AdvancedPDFParser:
 
         for phrase_lower, score in ranked_keywords:
             data = phrase_candidates[phrase_lower]
-            normalized_key = phrase_lower.replace("-", " ")
+            # phrase_lower is already lowercase with only token characters,
+            # so dropping hyphens and collapsing whitespace yields the same
+            # key normalize_keyword would compute from the display form
+            normalized_key = _WS_RE.sub(' ', phrase_lower.replace("-", " ")).strip()
 
             if normalized_key in seen_keys:
                 continue
 
-            if not add_keyword(data["display"]):
+            if not add_keyword(data["display"], normalized=normalized_key):
                 continue
 
             if len(keywords) >= max_keywords:
@@ -957,28 +1297,9 @@ class AdvancedPDFParser:
             return []
 
         declared_keywords: List[str] = []
-        keyword_sections: List[str] = []
-
-        keyword_patterns = [
-            re.compile(r'\bkeywords?\s*[:\-]\s*(.+)', re.IGNORECASE),
-            re.compile(r'\bindex\s+terms?\s*[:\-]\s*(.+)', re.IGNORECASE),
-            re.compile(r'\bkey\s+phrases?\s*[:\-]\s*(.+)', re.IGNORECASE)
-        ]
-
-        for line in text.splitlines():
-            stripped = line.strip()
-            if not stripped:
-                continue
 
-            for pattern in keyword_patterns:
-                match = pattern.search(stripped)
-                if match:
-                    keyword_sections.append(match.group(1))
-                    break
-
-        for section in keyword_sections:
-            tokens = re.split(r'[;,]', section)
-            for token in tokens:
+        for match in _DECLARED_KW_RE.finditer(text):
+            for token in _KW_SPLIT_RE.split(match.group(1)):
                 candidate = token.strip()
                 candidate = candidate.rstrip('.;:')
                 if len(candidate) < 3:
@@ -991,38 +1312,57 @@ class AdvancedPDFParser:
         seen = set()
         unique_keywords = []
         for keyword in declared_keywords:
-            normalized = re.sub(r'\s+', ' ', keyword.lower()).strip()
+            normalized = _WS_RE.sub(' ', keyword.lower()).strip()
             if normalized and normalized not in seen:
                 seen.add(normalized)
                 unique_keywords.append(keyword)
 
         return unique_keywords
     
-    def parse_pdf_advanced(self, pdf_path: str) -> Dict:
-        """Main method to parse PDF with all advanced features"""
-        layout_data = self.extract_text_with_layout(pdf_path)
-        
+    def parse_pdf_advanced(self, pdf_source) -> Dict:
+        """Main method to parse PDF with all advanced features.
+
+        ``pdf_source`` may be a filesystem path or raw PDF bytes.
+        """
+        layout_data = self.extract_text_with_layout(pdf_source)
+
         # If title extraction failed, try to get it from filename
         if layout_data.get('title', '') == 'Unknown Title':
-            filename_title = self._extract_title_from_filename(pdf_path)
+            filename_title = self._extract_title_from_filename(pdf_source)
             if filename_title != 'Unknown Title':
-                print(f"DEBUG - Using filename title: '{filename_title}'")
+                logger.debug("Using filename title: '%s'", filename_title)
                 layout_data['title'] = filename_title
-        
-        # Extract all advanced features
-        citations = self.extract_citations(layout_data['full_text'])
-        reference_map = self.extract_references(layout_data['full_text'])
-        figures_tables = self.extract_figures_tables(layout_data['full_text'], layout_data['pages'], pdf_path)
-        math_content: List[MathematicalContent] = []
+
         from .pdf_handler import split_into_sections
-        sections = split_into_sections(layout_data['full_text'])
 
-        keywords = self.extract_keywords(
-            layout_data['full_text'],
-            metadata=layout_data,
-            sections=sections
-        )
-        
+        # Extract all advanced features. The extractions all read the same
+        # full text and are independent of one another, so the heavier ones
+        # run on threads: regex scanning releases the GIL in stretches and
+        # figure/table extraction also waits on image decoding. Keywords
+        # need the section split, so that pair runs on the caller's thread
+        # while the rest proceed.
+        full_text = layout_data['full_text']
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            citations_future = pool.submit(self.extract_citations, full_text)
+            references_future = pool.submit(self.extract_references, full_text)
+            figures_future = pool.submit(
+                self.extract_figures_tables, full_text, layout_data['pages'], pdf_source
+            )
+
+            sections = split_into_sections(full_text)
+            keywords = self.extract_keywords(
+                full_text,
+                metadata=layout_data,
+                sections=sections
+            )
+
+            citations = citations_future.result()
+            reference_map = references_future.result()
+            figures_tables = figures_future.result()
+
+        math_content: List[MathematicalContent] = []
+
+
         return {
             'sections': sections,
             'citations': citations,
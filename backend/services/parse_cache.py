@@ -0,0 +1,41 @@
+import hashlib
+import mmap
+import pickle
+from pathlib import Path
+from typing import Any, Optional
+
+from diskcache import Cache
+
+# Bump whenever parser output format changes so stale entries are ignored
+PARSER_VERSION = 3
+
+_BLOCK_SIZE = 1 << 20  # 1 MiB
+
+_cache = Cache(str(Path("uploads") / ".cache"))
+
+
+def sha256_file(path: str) -> str:
+    """Compute the SHA-256 fingerprint of a file using mmap'd 1 MiB blocks."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in range(0, len(mm), _BLOCK_SIZE):
+                    hasher.update(mm[offset:offset + _BLOCK_SIZE])
+        except ValueError:
+            # Empty files cannot be mmap'd; the empty hash is still valid
+            pass
+    return hasher.hexdigest()
+
+
+def get_cached(file_hash: str, endpoint: str) -> Optional[Any]:
+    """Return the cached parse result for (file hash, endpoint), or None."""
+    blob = _cache.get((file_hash, PARSER_VERSION, endpoint))
+    if blob is None:
+        return None
+    return pickle.loads(blob)
+
+
+def set_cached(file_hash: str, endpoint: str, value: Any) -> None:
+    """Store a parse result keyed by (file hash, parser version, endpoint)."""
+    _cache.set((file_hash, PARSER_VERSION, endpoint), pickle.dumps(value))
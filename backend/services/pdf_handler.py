@@ -2,36 +2,61 @@ import fitz  # PyMuPDF
 from pathlib import Path
 import re
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+# Section patterns, compiled once at import instead of per call. They run
+# against a pre-lowercased copy of the text, so no IGNORECASE flag: one
+# lowercase pass up front is cheaper than per-character case folding inside
+# the regex engine on every search. Offsets from the lowered copy index the
+# original text directly since ASCII lower() preserves length.
+# Enhanced patterns: optional colon, handle various numbering formats.
+_ABSTRACT_RE = re.compile(r"^\s*\d*\.?\s*\babstract\b[:\s]*", re.MULTILINE)
+_INTRO_RE = re.compile(r"^\s*\d*\.?\s*\bintroduction\b[:\s]*", re.MULTILINE)
+
+# Enhanced heading patterns for more section types
+_NEXT_HEADING_RE = re.compile(
+    r"^\s*\d*\.?\s*(related work|literature review|background|methodology|methods?|approach|results?|experiments?|evaluation|discussion|analysis|conclusion|conclusions|references|bibliography|acknowledgments?|future work|limitations)\b[:\s]*",
+    re.MULTILINE
+)
+
+# The four named-section patterns fused into one alternation: a single
+# finditer pass dispatching on lastgroup replaces four full-text searches.
+# Each alternative carries exactly one named group, so lastgroup is the
+# matched category.
+_SECTION_RE = re.compile(
+    r"^\s*\d*\.?\s*(?:(?P<methodology>methodology|methods?|approach)"
+    r"|(?P<results>results?|experiments?|evaluation)"
+    r"|(?P<discussion>discussion|analysis)"
+    r"|(?P<conclusion>conclusions?))\b[:\s]*",
+    re.MULTILINE
+)
+
+
+def extract_text_from_pdf(pdf_source) -> str:
     """
-    Extracts all text from the given PDF file.
+    Extracts all text from the given PDF, passed as a path or raw bytes.
     """
-    if not Path(pdf_path).exists():
-        raise FileNotFoundError(f"File {pdf_path} not found.")
-    
-    doc = fitz.open(pdf_path)
-    all_text = ""
-    for page in doc:
-        all_text += page.get_text()
-    doc.close()
-    
+    if isinstance(pdf_source, (bytes, bytearray)):
+        doc = fitz.open(stream=pdf_source, filetype="pdf")
+    else:
+        if not Path(pdf_source).exists():
+            raise FileNotFoundError(f"File {pdf_source} not found.")
+        doc = fitz.open(pdf_source)
+    try:
+        # Join once at the end: += on a growing string recopies the whole
+        # buffer for every page
+        all_text = "".join(page.get_text() for page in doc)
+    finally:
+        doc.close()
+
     return all_text.strip()
 
 def split_into_sections(text: str) -> dict:
     normalized_text = text.replace("\r", "\n")
+    # Case folding happens once here; all heading searches run over the
+    # lowered copy while the section slices index the original text
+    lower_text = normalized_text.lower()
 
-    # Enhanced patterns: case-insensitive, optional colon, handles various numbering formats
-    abstract_pattern = re.compile(r"^\s*\d*\.?\s*\babstract\b[:\s]*", re.IGNORECASE | re.MULTILINE)
-    intro_pattern = re.compile(r"^\s*\d*\.?\s*\bintroduction\b[:\s]*", re.IGNORECASE | re.MULTILINE)
-
-    # Enhanced heading patterns for more section types
-    next_heading_pattern = re.compile(
-        r"^\s*\d*\.?\s*(related work|literature review|background|methodology|methods?|approach|results?|experiments?|evaluation|discussion|analysis|conclusion|conclusions|references|bibliography|acknowledgments?|future work|limitations)\b[:\s]*",
-        re.IGNORECASE | re.MULTILINE
-    )
-
-    abstract_match = abstract_pattern.search(normalized_text)
-    intro_match = intro_pattern.search(normalized_text)
+    abstract_match = _ABSTRACT_RE.search(lower_text)
+    intro_match = _INTRO_RE.search(lower_text)
 
     abstract = ""
     introduction = ""
@@ -40,7 +65,7 @@ def split_into_sections(text: str) -> dict:
     if abstract_match and intro_match:
         abstract = normalized_text[abstract_match.end():intro_match.start()].strip()
 
-        next_heading_match = next_heading_pattern.search(normalized_text, intro_match.end())
+        next_heading_match = _NEXT_HEADING_RE.search(lower_text, intro_match.end())
         if next_heading_match:
             introduction = normalized_text[intro_match.end():next_heading_match.start()].strip()
             main_body = normalized_text[next_heading_match.start():].strip()
@@ -48,7 +73,7 @@ def split_into_sections(text: str) -> dict:
             introduction = normalized_text[intro_match.end():].strip()
 
     elif intro_match:  # No abstract
-        next_heading_match = next_heading_pattern.search(normalized_text, intro_match.end())
+        next_heading_match = _NEXT_HEADING_RE.search(lower_text, intro_match.end())
         if next_heading_match:
             introduction = normalized_text[intro_match.end():next_heading_match.start()].strip()
             main_body = normalized_text[next_heading_match.start():].strip()
@@ -58,34 +83,26 @@ def split_into_sections(text: str) -> dict:
     else:  # No headings found
         main_body = normalized_text.strip()
 
-    print({
-        "abstract": abstract,  # Debug only first 200 chars
-        "introduction": introduction,
-        "main_body": main_body
-    })
+    # One pass collecting the first occurrence of each named section, instead
+    # of four independent full-text searches
+    section_matches = {}
+    for match in _SECTION_RE.finditer(lower_text):
+        name = match.lastgroup
+        if name not in section_matches:
+            section_matches[name] = match
+            if len(section_matches) == 4:
+                break
+
+    methodology_match = section_matches.get("methodology")
+    results_match = section_matches.get("results")
+    discussion_match = section_matches.get("discussion")
+    conclusion_match = section_matches.get("conclusion")
 
-    # Try to extract other sections as well
     methodology = ""
     results = ""
     discussion = ""
     conclusion = ""
-    
-    # Look for methodology section
-    methodology_pattern = re.compile(r"^\s*\d*\.?\s*(?:methodology|methods?|approach)\b[:\s]*", re.IGNORECASE | re.MULTILINE)
-    methodology_match = methodology_pattern.search(normalized_text)
-    
-    # Look for results section
-    results_pattern = re.compile(r"^\s*\d*\.?\s*(?:results?|experiments?|evaluation)\b[:\s]*", re.IGNORECASE | re.MULTILINE)
-    results_match = results_pattern.search(normalized_text)
-    
-    # Look for discussion section
-    discussion_pattern = re.compile(r"^\s*\d*\.?\s*(?:discussion|analysis)\b[:\s]*", re.IGNORECASE | re.MULTILINE)
-    discussion_match = discussion_pattern.search(normalized_text)
-    
-    # Look for conclusion section
-    conclusion_pattern = re.compile(r"^\s*\d*\.?\s*(?:conclusion|conclusions)\b[:\s]*", re.IGNORECASE | re.MULTILINE)
-    conclusion_match = conclusion_pattern.search(normalized_text)
-    
+
     # Extract sections based on found matches
     if methodology_match:
         next_match = results_match or discussion_match or conclusion_match
@@ -93,21 +110,21 @@ def split_into_sections(text: str) -> dict:
             methodology = normalized_text[methodology_match.end():next_match.start()].strip()
         else:
             methodology = normalized_text[methodology_match.end():].strip()
-    
+
     if results_match:
         next_match = discussion_match or conclusion_match
         if next_match:
             results = normalized_text[results_match.end():next_match.start()].strip()
         else:
             results = normalized_text[results_match.end():].strip()
-    
+
     if discussion_match:
         next_match = conclusion_match
         if next_match:
             discussion = normalized_text[discussion_match.end():next_match.start()].strip()
         else:
             discussion = normalized_text[discussion_match.end():].strip()
-    
+
     if conclusion_match:
         conclusion = normalized_text[conclusion_match.end():].strip()
 
@@ -1,14 +1,143 @@
+import hashlib
+import logging
 import os
-import json
 import math
-from typing import Dict, List, Any, Optional
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
+import orjson
 import requests
+import tiktoken
+from diskcache import Cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Persistent response cache for OpenAI calls. Prompts embed both the task
+# template and the paper text, and calls run at temperature 0, so identical
+# prompts are safe to answer from disk — repeat assessments of the same
+# paper skip the API entirely. diskcache bounds its own size with LRU-style
+# eviction, mirroring the parse cache.
+_llm_cache = Cache(str(Path("uploads") / ".llm_cache"))
+
+# Below this size the Batch API's turnaround time isn't worth its price
+# discount; realtime per-paper calls win
+_MIN_PAPERS_FOR_BATCH = 20
+
+_SYSTEM_MESSAGE = "You are an expert research paper reviewer and academic editor with extensive experience in various research fields. When asked to provide JSON responses, you MUST respond with ONLY valid JSON. Do not include any explanatory text, markdown formatting, or code blocks. The JSON must be properly formatted and parseable."
+
+# Keyword tables for field identification, constant data hoisted to module
+# scope. Order doubles as the tie-break when fields score equally.
+_FIELD_KEYWORDS = (
+    ('Computer Science', (
+        'algorithm', 'programming', 'software', 'computer', 'computing', 'data structure',
+        'machine learning', 'artificial intelligence', 'neural network', 'deep learning',
+        'natural language processing', 'computer vision', 'database', 'system',
+        'network', 'security', 'cybersecurity', 'blockchain', 'cryptography'
+    )),
+    ('Artificial Intelligence', (
+        'artificial intelligence', 'ai', 'machine learning', 'neural network', 'deep learning',
+        'reinforcement learning', 'supervised learning', 'unsupervised learning',
+        'computer vision', 'natural language processing', 'nlp', 'automation',
+        'intelligent system', 'cognitive', 'reasoning', 'knowledge representation'
+    )),
+    ('Machine Learning', (
+        'machine learning', 'ml', 'neural network', 'deep learning', 'model', 'training',
+        'classification', 'regression', 'clustering', 'feature extraction', 'optimization',
+        'gradient descent', 'backpropagation', 'tensorflow', 'pytorch', 'scikit-learn'
+    )),
+    ('Mathematics', (
+        'mathematical', 'equation', 'theorem', 'proof', 'algebra', 'calculus',
+        'statistics', 'probability', 'optimization', 'linear algebra', 'geometry',
+        'analysis', 'topology', 'number theory', 'discrete mathematics'
+    )),
+    ('Physics', (
+        'physics', 'quantum', 'mechanics', 'thermodynamics', 'electromagnetic',
+        'particle', 'energy', 'force', 'motion', 'wave', 'relativity', 'quantum mechanics'
+    )),
+    ('Biology', (
+        'biology', 'biological', 'cell', 'dna', 'protein', 'genetics', 'evolution',
+        'organism', 'molecular biology', 'biochemistry', 'ecology', 'microbiology'
+    )),
+    ('Medicine', (
+        'medical', 'medicine', 'clinical', 'patient', 'treatment', 'diagnosis',
+        'therapy', 'healthcare', 'disease', 'symptom', 'pharmaceutical', 'drug'
+    )),
+    ('Engineering', (
+        'engineering', 'mechanical', 'electrical', 'civil', 'chemical', 'design',
+        'manufacturing', 'construction', 'materials', 'structure', 'system design'
+    )),
+)
+
+# keyword -> fields it scores for (several fields share keywords)
+_KW_FIELDS: Dict[str, List[str]] = {}
+for _field, _kws in _FIELD_KEYWORDS:
+    for _kw in _kws:
+        _KW_FIELDS.setdefault(_kw, []).append(_field)
+
+# keyword -> shorter keywords it contains: a hit on the longer one implies
+# the shorter is present as a substring, matching the original `in` checks
+_KW_IMPLIES = {
+    kw: tuple(other for other in _KW_FIELDS if other != kw and other in kw)
+    for kw in _KW_FIELDS
+}
+
+# All keywords fused into one alternation, longest first, inside a lookahead
+# so matches are zero-width and overlapping keywords at different positions
+# are all collected in a single scan
+_FIELD_KW_RE = re.compile(
+    '(?=(' + '|'.join(
+        re.escape(kw) for kw in sorted(_KW_FIELDS, key=len, reverse=True)
+    ) + '))'
+)
+
+# Canonical names for common abbreviations and casings the model returns
+# for research fields
+_FIELD_ALIASES = {
+    'cs': 'Computer Science',
+    'computer science': 'Computer Science',
+    'ai': 'Artificial Intelligence',
+    'artificial intelligence': 'Artificial Intelligence',
+    'ml': 'Machine Learning',
+    'machine learning': 'Machine Learning',
+    'nlp': 'Natural Language Processing',
+    'natural language processing': 'Natural Language Processing'
+}
+
+# Sentence boundaries and scoring tokens for the extractive digest
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_WORD_RE = re.compile(r'[a-z]{3,}')
+
+# Sentences kept in the extractive digest before token capping
+_DIGEST_SENTENCES = 12
+
+# Outermost {...} span of an LLM response; DOTALL because the JSON is
+# pretty-printed across lines
+_JSON_OBJ_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def _extract_json(response: str) -> Dict[str, Any]:
+    """Parse the JSON object embedded in an LLM response.
+
+    Responses are requested as bare JSON but sometimes arrive wrapped in
+    markdown fences or stray prose. Instead of stripping each wrapper
+    variant by hand, grab the outermost ``{...}`` span and parse it with
+    orjson, which is both more tolerant of the surroundings and several
+    times faster than the stdlib parser on these multi-kilobyte payloads.
+    """
+    match = _JSON_OBJ_RE.search(response)
+    if match is None:
+        raise ValueError("no JSON object found in response")
+    return orjson.loads(match.group(0))
+
+
+@dataclass(slots=True)
 class MissingContent:
     """Represents missing content or topics in a research paper"""
     category: str
@@ -18,7 +147,7 @@ class MissingContent:
     suggestion: str
     related_sections: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class ResearchAssessment:
     """Complete assessment of a research paper"""
     paper_title: str
@@ -40,10 +169,82 @@ class ResearchPaperAssessor:
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         if not self.openai_api_key:
             raise RuntimeError("OPENAI_API_KEY is missing from .env file")
-    
-    def assess_research_paper(self, paper_content: Dict[str, Any]) -> ResearchAssessment:
+        # Tokenizer for prompt truncation: budgets are what the model
+        # actually bills in, and character slicing under-fills them badly
+        # for prose (~4 chars/token), wasting context the model could use.
+        # tiktoken fetches its BPE table over the network on first use, so
+        # any failure here (offline host, CDN outage) just downgrades
+        # truncation to character slicing instead of breaking assessments.
+        try:
+            self._enc = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        except Exception:
+            try:
+                self._enc = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                self._enc = None
+        # One pooled session for every OpenAI call: connections are kept
+        # alive between requests, so TCP + TLS setup is paid per connection
+        # rather than per call. The auth header rides on the session too.
+        self._session = requests.Session()
+        self._session.headers["Authorization"] = f"Bearer {self.openai_api_key}"
+
+    def close(self) -> None:
+        """Release the pooled HTTP connections; called from app shutdown."""
+        self._session.close()
+
+    def _truncate_tokens(self, text: str, max_tokens: int) -> str:
+        """Trim text to a token budget instead of a character count.
+
+        Falls back to an ~4 chars/token slice when no tokenizer could be
+        loaded, so the budget is honoured approximately rather than not
+        at all.
+        """
+        if self._enc is None:
+            return text[:max_tokens * 4]
+        tokens = self._enc.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return self._enc.decode(tokens[:max_tokens])
+
+    def _summarize_once(self, full_text: str, max_tokens: int = 1000) -> str:
+        """Distill the paper into a short extractive summary.
+
+        Built once per assessment and shared by the prompts that judge
+        overall quality, so the paper body is condensed a single time
+        instead of a multi-thousand-token slice being re-shipped to each
+        call. Sentences are ranked by word-frequency centrality — the
+        stdlib stand-in for an embedding pass, which would cost its own
+        API round trip — and the winners keep document order.
+        """
+        sentences = [s.strip() for s in _SENT_SPLIT_RE.split(full_text) if len(s.strip()) > 30]
+        if len(sentences) <= _DIGEST_SENTENCES:
+            return self._truncate_tokens(full_text, max_tokens)
+
+        freq = Counter(w for s in sentences for w in _WORD_RE.findall(s.lower()))
+
+        def centrality(sentence: str) -> float:
+            words = _WORD_RE.findall(sentence.lower())
+            if not words:
+                return 0.0
+            return sum(freq[w] for w in words) / len(words)
+
+        ranked = sorted(range(len(sentences)),
+                        key=lambda i: centrality(sentences[i]), reverse=True)
+        keep = sorted(ranked[:_DIGEST_SENTENCES])
+        return self._truncate_tokens(" ".join(sentences[i] for i in keep), max_tokens)
+
+    def assess_research_paper(self, paper_content: Dict[str, Any],
+                              combined: Optional[Dict[str, Any]] = None
+                              ) -> Tuple[ResearchAssessment, Dict[str, Any]]:
         """
-        Comprehensive assessment of a research paper
+        Comprehensive assessment of a research paper.
+
+        Returns the assessment together with its score breakdown, so
+        callers on different threads never read shared state back off the
+        assessor instance.
+
+        ``combined`` lets batch processing hand in already fanned-out
+        multi-task results so no realtime call is made here.
         """
         try:
             # Extract paper information
@@ -58,28 +259,69 @@ class ResearchPaperAssessor:
             
             # Combine all text for analysis
             full_text = f"{abstract}\n\n{introduction}\n\n{methodology}\n\n{results}\n\n{discussion}\n\n{conclusion}"
-            
-            # Determine research field
-            research_field = self._identify_research_field(full_text, title)
-            
-            # Perform comprehensive analysis
-            missing_content = self._analyze_missing_content(full_text, research_field)
-            strengths = self._identify_strengths(full_text)
-            weaknesses = self._identify_weaknesses(full_text, missing_content)
+
+            # One multi-task call covers the field, missing content,
+            # strengths/weaknesses and all four section analyses: the paper
+            # text ships once instead of being re-sent for every question,
+            # and eight round trips collapse into one
+            if combined is None:
+                combined = self._run_combined_assessment(full_text, title, references)
+            if combined is not None:
+                research_field = combined['research_field']
+                missing_content = combined['missing_content']
+                strengths = combined['strengths']
+                weaknesses = combined['weaknesses']
+                methodology_analysis = combined['methodology_analysis']
+                literature_review_analysis = combined['literature_review_analysis']
+                results_analysis = combined['results_analysis']
+                discussion_analysis = combined['discussion_analysis']
+            else:
+                # Fall back to the one-call-per-question flow. Once the
+                # field is known the remaining calls are independent and
+                # network-bound, so they overlap on threads: wall-clock is
+                # roughly the slowest call instead of the sum of all of them
+                research_field = self._identify_research_field(full_text, title)
+                # The quality-judgment prompts share one extractive digest
+                # of the paper instead of each getting its own long slice.
+                # Missing-content analysis keeps the full text: its job is
+                # spotting absences, which a digest would hide.
+                digest = self._summarize_once(full_text)
+                with ThreadPoolExecutor(max_workers=6) as pool:
+                    missing_future = pool.submit(self._analyze_missing_content, full_text, research_field)
+                    strengths_future = pool.submit(self._identify_strengths, digest)
+                    methodology_future = pool.submit(self._analyze_methodology, methodology)
+                    literature_future = pool.submit(self._analyze_literature_review, introduction, references)
+                    results_future = pool.submit(self._analyze_results, results)
+                    discussion_future = pool.submit(self._analyze_discussion, discussion, results)
+
+                    # Weaknesses take the missing-content list, so that call
+                    # runs on this thread as soon as its input resolves
+                    missing_content = missing_future.result()
+                    weaknesses = self._identify_weaknesses(digest, missing_content)
+
+                    strengths = strengths_future.result()
+                    methodology_analysis = methodology_future.result()
+                    literature_review_analysis = literature_future.result()
+                    results_analysis = results_future.result()
+                    discussion_analysis = discussion_future.result()
+
+            # Empty sections keep their deterministic "missing" analyses
+            # regardless of which path produced the rest
+            if not methodology.strip():
+                methodology_analysis = {"score": 0, "issues": ["Methodology section is missing"], "suggestions": ["Add comprehensive methodology section"]}
+            if not results.strip():
+                results_analysis = {"score": 0, "issues": ["Results section is missing"], "suggestions": ["Add comprehensive results section"]}
+            if not discussion.strip():
+                discussion_analysis = {"score": 0, "issues": ["Discussion section is missing"], "suggestions": ["Add comprehensive discussion section"]}
+
             recommendations = self._generate_recommendations(missing_content, weaknesses)
-            
-            # Section-specific analyses
-            methodology_analysis = self._analyze_methodology(methodology)
-            literature_review_analysis = self._analyze_literature_review(introduction, references)
-            results_analysis = self._analyze_results(results)
-            discussion_analysis = self._analyze_discussion(discussion, results)
-            
+
             # Calculate completeness score using both structural and quality metrics
-            completeness_score = self._calculate_completeness_score(
-                paper_content, missing_content, methodology_analysis, 
+            completeness_score, score_breakdown = self._calculate_completeness_score(
+                paper_content, missing_content, methodology_analysis,
                 literature_review_analysis, results_analysis, discussion_analysis
             )
-            
+
             return ResearchAssessment(
                 paper_title=title,
                 research_field=research_field,
@@ -92,13 +334,253 @@ class ResearchPaperAssessor:
                 literature_review_analysis=literature_review_analysis,
                 results_analysis=results_analysis,
                 discussion_analysis=discussion_analysis
-            )
+            ), score_breakdown
             
         except Exception as e:
             raise Exception(f"Assessment failed: {str(e)}")
     
+    def assess_research_papers_batch(self, papers: List[Dict[str, Any]],
+                                     poll_interval: float = 30.0,
+                                     poll_timeout: float = 24 * 3600
+                                     ) -> List[Tuple[ResearchAssessment, Dict[str, Any]]]:
+        """Assess many papers through the OpenAI Batch API.
+
+        Batch pricing is half the realtime rate and the endpoint is built
+        for throughput, so bulk ingests submit one JSONL of combined-task
+        prompts and poll for the output instead of paying per-paper
+        realtime calls. Small batches — and any batch that fails — fall
+        back to the per-paper path.
+        """
+        if len(papers) < _MIN_PAPERS_FOR_BATCH:
+            return [self.assess_research_paper(paper) for paper in papers]
+
+        contexts = []
+        lines = []
+        for idx, paper in enumerate(papers):
+            sections = paper.get('sections', {})
+            title = paper.get('metadata', {}).get('title', 'Unknown Title')
+            references = paper.get('citations', [])
+            full_text = "\n\n".join(
+                sections.get(name, '')
+                for name in ('abstract', 'introduction', 'methodology',
+                             'results', 'discussion', 'conclusion')
+            )
+            contexts.append((paper, full_text, title))
+            lines.append(orjson.dumps({
+                "custom_id": f"paper-{idx}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": "gpt-3.5-turbo",
+                    "messages": [
+                        {"role": "system", "content": _SYSTEM_MESSAGE},
+                        {"role": "user", "content": self._build_combined_prompt(full_text, title, references)}
+                    ],
+                    "temperature": 0.0,
+                    "max_tokens": 3000
+                }
+            }).decode())
+
+        try:
+            responses = self._run_openai_batch("\n".join(lines), poll_interval, poll_timeout)
+        except Exception as e:
+            logger.warning("Batch assessment failed, falling back to per-paper calls: %s", e)
+            return [self.assess_research_paper(paper) for paper in papers]
+
+        assessments = []
+        for idx, (paper, full_text, title) in enumerate(contexts):
+            combined = None
+            response = responses.get(f"paper-{idx}")
+            if response:
+                try:
+                    combined = self._fan_out_combined(_extract_json(response), full_text, title)
+                except Exception as e:
+                    logger.debug("Batch response parsing failed for paper-%d: %s", idx, e)
+            # A missing or unparseable entry degrades to the realtime path
+            # for just that paper
+            assessments.append(self.assess_research_paper(paper, combined=combined))
+
+        return assessments
+
+    def _run_openai_batch(self, jsonl_payload: str, poll_interval: float,
+                          poll_timeout: float) -> Dict[str, str]:
+        """Submit a chat-completions batch and return contents keyed by custom_id."""
+        upload = self._session.post(
+            "https://api.openai.com/v1/files",
+            data={"purpose": "batch"},
+            files={"file": ("assessments.jsonl", jsonl_payload.encode())},
+            timeout=120
+        )
+        upload.raise_for_status()
+
+        batch = self._session.post(
+            "https://api.openai.com/v1/batches",
+            json={
+                "input_file_id": upload.json()["id"],
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h"
+            },
+            timeout=60
+        )
+        batch.raise_for_status()
+        batch_id = batch.json()["id"]
+
+        deadline = time.monotonic() + poll_timeout
+        while True:
+            status = self._session.get(
+                f"https://api.openai.com/v1/batches/{batch_id}",
+                timeout=60
+            )
+            status.raise_for_status()
+            info = status.json()
+            if info["status"] == "completed":
+                break
+            if info["status"] in ("failed", "expired", "cancelled"):
+                raise Exception(f"OpenAI batch {batch_id} ended with status: {info['status']}")
+            if time.monotonic() > deadline:
+                raise Exception(f"OpenAI batch {batch_id} did not complete within {poll_timeout:.0f}s")
+            time.sleep(poll_interval)
+
+        output = self._session.get(
+            f"https://api.openai.com/v1/files/{info['output_file_id']}/content",
+            timeout=120
+        )
+        output.raise_for_status()
+
+        responses: Dict[str, str] = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            body = (record.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or []
+            if choices:
+                responses[record["custom_id"]] = choices[0].get("message", {}).get("content", "")
+        return responses
+
+    def _build_combined_prompt(self, full_text: str, title: str, references: List[Any]) -> str:
+        """Build the multi-task prompt shared by the realtime and batch paths."""
+        return f"""
+        As an expert research paper reviewer, perform ALL of the following analysis tasks on the paper below in a single pass.
+
+        Title: {title}
+        Number of references found: {len(references)}
+        Paper content: {self._truncate_tokens(full_text, 5000)}...
+
+        CRITICAL INSTRUCTIONS:
+        1. You MUST respond with ONLY valid JSON
+        2. Do NOT include any explanatory text before or after the JSON
+        3. Do NOT use markdown code blocks (```json)
+        4. The JSON must be properly formatted with correct quotes and brackets
+
+        Task A - "research_field": the primary research field as a short plain name (e.g. "Computer Science", "Medicine", "Psychology").
+        Task B - "missing_content": elements missing from the paper. For each give category (one of "Methodology", "Literature Review", "Results", "Discussion", "Ethics", "Limitations", "Future Work", "Conclusion"), topic, importance ("Critical", "Important" or "Beneficial"), description, suggestion and related_sections. Use an empty array if nothing is missing.
+        Task C - "strengths": 3-5 main strengths of the paper as short statements.
+        Task D - "weaknesses": 3-5 main weaknesses, focusing on methodological issues, gaps in analysis or presentation problems.
+        Task E - "methodology_analysis": score (0-100), issues and suggestions for the methodology.
+        Task F - "literature_review_analysis": score (0-100), coverage_adequacy, critical_analysis, research_gap_identification and suggestions.
+        Task G - "results_analysis": score (0-100), presentation_clarity, statistical_analysis, visual_elements and suggestions.
+        Task H - "discussion_analysis": score (0-100), result_interpretation, literature_comparison, limitations, future_work and suggestions.
+
+        RESPOND WITH ONLY THIS JSON FORMAT (NO OTHER TEXT):
+        {{
+            "research_field": "Computer Science",
+            "missing_content": [
+                {{
+                    "category": "Methodology",
+                    "topic": "Statistical Analysis",
+                    "importance": "Critical",
+                    "description": "Missing detailed statistical analysis methods",
+                    "suggestion": "Add section on statistical tests used",
+                    "related_sections": ["Methodology", "Results"]
+                }}
+            ],
+            "strengths": ["Strength 1", "Strength 2", "Strength 3"],
+            "weaknesses": ["Weakness 1", "Weakness 2", "Weakness 3"],
+            "methodology_analysis": {{"score": 75, "issues": ["Issue 1"], "suggestions": ["Suggestion 1"]}},
+            "literature_review_analysis": {{"score": 80, "coverage_adequacy": "...", "critical_analysis": "...", "research_gap_identification": "...", "suggestions": ["Suggestion 1"]}},
+            "results_analysis": {{"score": 85, "presentation_clarity": "...", "statistical_analysis": "...", "visual_elements": "...", "suggestions": ["Suggestion 1"]}},
+            "discussion_analysis": {{"score": 70, "result_interpretation": "...", "literature_comparison": "...", "limitations": "...", "future_work": "...", "suggestions": ["Suggestion 1"]}}
+        }}
+        """
+
+    def _run_combined_assessment(self, full_text: str, title: str, references: List[Any]) -> Optional[Dict[str, Any]]:
+        """Run every analysis task as one multi-task OpenAI call.
+
+        Returns the fanned-out results, or None when the call or its JSON
+        parsing fails so the caller can fall back to individual calls.
+        """
+        prompt = self._build_combined_prompt(full_text, title, references)
+
+        try:
+            response = self._call_openai(prompt, max_tokens=3000)
+            data = _extract_json(response)
+        except Exception as e:
+            logger.warning("Combined assessment call failed, falling back to individual calls: %s", e)
+            return None
+
+        return self._fan_out_combined(data, full_text, title)
+
+    def _fan_out_combined(self, data: Dict[str, Any], full_text: str, title: str) -> Dict[str, Any]:
+        """Fan a combined response out with the same defaults the individual
+        analysis methods apply."""
+        research_field = self._clean_research_field_response(str(data.get("research_field", "")).strip())
+        if not research_field or research_field == "Unknown" or len(research_field) < 3:
+            research_field = self._identify_field_by_keywords(full_text, title)
+
+        missing_content = []
+        for item in data.get("missing_content", []):
+            missing_content.append(MissingContent(
+                category=item.get("category", "Unknown"),
+                topic=item.get("topic", "Unknown"),
+                importance=item.get("importance", "Important"),
+                description=item.get("description", "No description provided"),
+                suggestion=item.get("suggestion", "No suggestion provided"),
+                related_sections=item.get("related_sections", ["General"])
+            ))
+
+        strengths = [str(s) for s in data.get("strengths", []) if str(s).strip()][:5]
+        weaknesses = [str(w) for w in data.get("weaknesses", []) if str(w).strip()][:5]
+
+        def section_analysis(key: str, fallback: Dict[str, Any]) -> Dict[str, Any]:
+            analysis = data.get(key)
+            if not isinstance(analysis, dict) or 'score' not in analysis:
+                return fallback
+            return analysis
+
+        return {
+            'research_field': research_field,
+            'missing_content': missing_content,
+            'strengths': strengths or ["Analysis completed - strengths identified"],
+            'weaknesses': weaknesses or ["Analysis completed - weaknesses identified"],
+            'methodology_analysis': section_analysis(
+                "methodology_analysis",
+                {"score": 50, "issues": ["Unable to analyze methodology"], "suggestions": ["Review methodology section manually"]}
+            ),
+            'literature_review_analysis': section_analysis(
+                "literature_review_analysis",
+                {"score": 50, "coverage_adequacy": "Unknown", "critical_analysis": "Unknown", "research_gap_identification": "Unknown", "suggestions": ["Review literature review manually"]}
+            ),
+            'results_analysis': section_analysis(
+                "results_analysis",
+                {"score": 50, "presentation_clarity": "Unknown", "statistical_analysis": "Unknown", "visual_elements": "Unknown", "suggestions": ["Review results section manually"]}
+            ),
+            'discussion_analysis': section_analysis(
+                "discussion_analysis",
+                {"score": 50, "result_interpretation": "Unknown", "literature_comparison": "Unknown", "limitations": "Unknown", "future_work": "Unknown", "suggestions": ["Review discussion section manually"]}
+            ),
+        }
+
     def _identify_research_field(self, text: str, title: str) -> str:
         """Identify the research field based on content"""
+        # Keyword scoring is free; only spend an API call when it is
+        # ambiguous. A clear winner (a lead of two or more matches) is the
+        # same answer the model would give for these broad field labels.
+        field_scores = self._field_keyword_scores(text, title)
+        ranked = sorted(field_scores.values(), reverse=True)
+        if ranked[0] > 0 and ranked[0] - ranked[1] >= 2:
+            return max(field_scores, key=field_scores.get)
+
         prompt = f"""
         Analyze the following research paper title and content to identify the primary research field.
         
@@ -106,7 +588,7 @@ class ResearchPaperAssessor:
         Examples: "Computer Science", "Medicine", "Psychology", "Physics", "Engineering", "Biology"
         
         Title: {title}
-        Content: {text[:2000]}...
+        Content: {self._truncate_tokens(text, 1500)}...
         
         Return only the field name:
         """
@@ -121,7 +603,7 @@ class ResearchPaperAssessor:
             
             return cleaned_response
         except Exception as e:
-            print(f"Research field identification failed: {e}")
+            logger.debug("Research field identification failed: %s", e)
             return self._identify_field_by_keywords(text, title)
     
     def _clean_research_field_response(self, response: str) -> str:
@@ -132,13 +614,12 @@ class ResearchPaperAssessor:
         # Remove common JSON patterns
         if response.startswith('{') and response.endswith('}'):
             try:
-                import json
-                data = json.loads(response)
+                data = _extract_json(response)
                 if 'field' in data:
                     return data['field']
                 elif 'research_field' in data:
                     return data['research_field']
-            except:
+            except Exception:
                 pass
         
         # Remove quotes if present
@@ -150,20 +631,9 @@ class ResearchPaperAssessor:
             response = response.split(':', 1)[1].strip()
         
         # Clean up common variations
-        field_mapping = {
-            'cs': 'Computer Science',
-            'computer science': 'Computer Science',
-            'ai': 'Artificial Intelligence',
-            'artificial intelligence': 'Artificial Intelligence',
-            'ml': 'Machine Learning',
-            'machine learning': 'Machine Learning',
-            'nlp': 'Natural Language Processing',
-            'natural language processing': 'Natural Language Processing'
-        }
-        
         response_lower = response.lower().strip()
-        if response_lower in field_mapping:
-            return field_mapping[response_lower]
+        if response_lower in _FIELD_ALIASES:
+            return _FIELD_ALIASES[response_lower]
         
         # Capitalize properly if it's all lowercase
         if response.islower():
@@ -171,64 +641,34 @@ class ResearchPaperAssessor:
         
         return response
     
-    def _identify_field_by_keywords(self, text: str, title: str) -> str:
-        """Identify research field using keyword analysis as fallback"""
+    def _field_keyword_scores(self, text: str, title: str) -> Dict[str, int]:
+        """Score every field by keyword matches in the title and text."""
         combined_text = f"{title} {text}".lower()
-        
-        # Define keyword mappings for different fields
-        field_keywords = {
-            'Computer Science': [
-                'algorithm', 'programming', 'software', 'computer', 'computing', 'data structure',
-                'machine learning', 'artificial intelligence', 'neural network', 'deep learning',
-                'natural language processing', 'computer vision', 'database', 'system',
-                'network', 'security', 'cybersecurity', 'blockchain', 'cryptography'
-            ],
-            'Artificial Intelligence': [
-                'artificial intelligence', 'ai', 'machine learning', 'neural network', 'deep learning',
-                'reinforcement learning', 'supervised learning', 'unsupervised learning',
-                'computer vision', 'natural language processing', 'nlp', 'automation',
-                'intelligent system', 'cognitive', 'reasoning', 'knowledge representation'
-            ],
-            'Machine Learning': [
-                'machine learning', 'ml', 'neural network', 'deep learning', 'model', 'training',
-                'classification', 'regression', 'clustering', 'feature extraction', 'optimization',
-                'gradient descent', 'backpropagation', 'tensorflow', 'pytorch', 'scikit-learn'
-            ],
-            'Mathematics': [
-                'mathematical', 'equation', 'theorem', 'proof', 'algebra', 'calculus',
-                'statistics', 'probability', 'optimization', 'linear algebra', 'geometry',
-                'analysis', 'topology', 'number theory', 'discrete mathematics'
-            ],
-            'Physics': [
-                'physics', 'quantum', 'mechanics', 'thermodynamics', 'electromagnetic',
-                'particle', 'energy', 'force', 'motion', 'wave', 'relativity', 'quantum mechanics'
-            ],
-            'Biology': [
-                'biology', 'biological', 'cell', 'dna', 'protein', 'genetics', 'evolution',
-                'organism', 'molecular biology', 'biochemistry', 'ecology', 'microbiology'
-            ],
-            'Medicine': [
-                'medical', 'medicine', 'clinical', 'patient', 'treatment', 'diagnosis',
-                'therapy', 'healthcare', 'disease', 'symptom', 'pharmaceutical', 'drug'
-            ],
-            'Engineering': [
-                'engineering', 'mechanical', 'electrical', 'civil', 'chemical', 'design',
-                'manufacturing', 'construction', 'materials', 'structure', 'system design'
-            ]
-        }
-        
+
+        # One pass over the text collects every keyword present, instead of
+        # a separate substring scan per keyword; substring implication then
+        # credits keywords contained inside longer hits
+        found = {match.group(1) for match in _FIELD_KW_RE.finditer(combined_text)}
+        for keyword in tuple(found):
+            found.update(_KW_IMPLIES[keyword])
+
         # Count keyword matches for each field
-        field_scores = {}
-        for field, keywords in field_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in combined_text)
-            field_scores[field] = score
-        
+        field_scores = {field: 0 for field, _ in _FIELD_KEYWORDS}
+        for keyword in found:
+            for field in _KW_FIELDS[keyword]:
+                field_scores[field] += 1
+
+        return field_scores
+
+    def _identify_field_by_keywords(self, text: str, title: str) -> str:
+        """Identify research field using keyword analysis as fallback"""
+        field_scores = self._field_keyword_scores(text, title)
+
         # Return the field with the highest score, or Computer Science as default
-        if field_scores:
-            best_field = max(field_scores, key=field_scores.get)
-            if field_scores[best_field] > 0:
-                return best_field
-        
+        best_field = max(field_scores, key=field_scores.get)
+        if field_scores[best_field] > 0:
+            return best_field
+
         return "Computer Science"  # Default fallback
     
     def _analyze_missing_content(self, text: str, research_field: str) -> List[MissingContent]:
@@ -236,7 +676,7 @@ class ResearchPaperAssessor:
         prompt = f"""
         As an expert research paper reviewer in {research_field}, analyze the following research paper content and identify missing elements that should typically be included in a comprehensive research paper in this field.
         
-        Paper content: {text[:4000]}...
+        Paper content: {self._truncate_tokens(text, 3500)}...
         
         CRITICAL INSTRUCTIONS:
         1. You MUST respond with ONLY valid JSON
@@ -278,22 +718,7 @@ class ResearchPaperAssessor:
         
         try:
             response = self._call_openai(prompt, max_tokens=2000)
-            
-            # Clean the response to extract only JSON
-            response = response.strip()
-            
-            # Remove any markdown code blocks if present
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.startswith('```'):
-                response = response[3:]
-            if response.endswith('```'):
-                response = response[:-3]
-            
-            response = response.strip()
-            
-            # Try to parse the JSON
-            data = json.loads(response)
+            data = _extract_json(response)
             
             missing_content = []
             for item in data.get("missing_content", []):
@@ -308,9 +733,10 @@ class ResearchPaperAssessor:
             
             return missing_content
             
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"JSON parsing error: {e}")
-            print(f"Response received: {response[:500]}...")
+        except (ValueError, KeyError) as e:
+            logger.debug("JSON parsing error: %s", e)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response received: %s...", response[:500])
             
             # Try to extract information from the response even if it's not perfect JSON
             try:
@@ -380,7 +806,7 @@ class ResearchPaperAssessor:
             return missing_content
             
         except Exception as e:
-            print(f"Text parsing fallback also failed: {e}")
+            logger.debug("Text parsing fallback also failed: %s", e)
             raise
     
     def _extract_category_from_line(self, line: str) -> str:
@@ -426,8 +852,11 @@ class ResearchPaperAssessor:
                                     methodology_analysis: Dict[str, Any] = None, 
                                     literature_review_analysis: Dict[str, Any] = None,
                                     results_analysis: Dict[str, Any] = None,
-                                    discussion_analysis: Dict[str, Any] = None) -> float:
-        """Calculate overall completeness score (0-100) combining structural and quality metrics"""
+                                    discussion_analysis: Dict[str, Any] = None
+                                    ) -> Tuple[float, Dict[str, Any]]:
+        """Calculate the overall completeness score (0-100) combining
+        structural and quality metrics, returned with its detailed
+        breakdown."""
         
         # Get deterministic section analysis
         sections = paper_content.get('sections', {})
@@ -468,8 +897,8 @@ class ResearchPaperAssessor:
         citation_weighted_contribution = (citation_percentage / 100.0) * 15.0  # 15% weight
         missing_content_weighted_contribution = (missing_content_percentage / 100.0) * 35.0  # 35% weight
         
-        # Store detailed scoring for transparency with weighted percentage breakdown
-        self._last_score_breakdown = {
+        # Detailed scoring for transparency with weighted percentage breakdown
+        score_breakdown = {
             'raw_scores': {
                 'structural_section_score': structural_section_raw,
                 'section_quality_score': section_quality_raw,
@@ -532,9 +961,9 @@ class ResearchPaperAssessor:
                 'missing_content_analysis': 0.35
             }
         }
-        
-        return final_score
-    
+
+        return final_score, score_breakdown
+
     def _calculate_section_scores(self, sections: Dict[str, str]) -> float:
         """Calculate section completeness score (0-100) - deterministic"""
         essential_sections = ['abstract', 'introduction', 'methodology', 'results', 'discussion', 'conclusion']
@@ -614,11 +1043,12 @@ class ResearchPaperAssessor:
         if not missing_content:
             return 100.0  # No missing content
         
-        # Count missing content by importance level
-        critical_count = len([c for c in missing_content if c.importance == "Critical"])
-        important_count = len([c for c in missing_content if c.importance == "Important"])
-        beneficial_count = len([c for c in missing_content if c.importance == "Beneficial"])
-        
+        # Count missing content by importance level in one pass
+        counts = Counter(c.importance for c in missing_content)
+        critical_count = counts["Critical"]
+        important_count = counts["Important"]
+        beneficial_count = counts["Beneficial"]
+
         # Deterministic scoring with diminishing returns
         critical_deduction = 0
         if critical_count >= 1:
@@ -702,10 +1132,11 @@ class ResearchPaperAssessor:
         if not missing_content:
             return 100.0  # Perfect completeness
         
-        # Calculate total penalty points
-        critical_count = len([c for c in missing_content if c.importance == "Critical"])
-        important_count = len([c for c in missing_content if c.importance == "Important"])
-        beneficial_count = len([c for c in missing_content if c.importance == "Beneficial"])
+        # Calculate total penalty points, tallying importance in one pass
+        counts = Counter(c.importance for c in missing_content)
+        critical_count = counts["Critical"]
+        important_count = counts["Important"]
+        beneficial_count = counts["Beneficial"]
         
         # Calculate penalty points (same logic as _calculate_missing_content_score)
         critical_deduction = 0
@@ -760,31 +1191,6 @@ class ResearchPaperAssessor:
         # Calculate average percentage of content quality
         return sum(quality_scores) / len(quality_scores)
     
-    def get_last_score_breakdown(self) -> Dict[str, Any]:
-        """Get the detailed breakdown of the last calculated score"""
-        return getattr(self, '_last_score_breakdown', {
-            'raw_scores': {
-                'structural_section_score': 0,
-                'section_quality_score': 0,
-                'citation_score': 0,
-                'missing_content_score': 0,
-            },
-            'weighted_score_breakdown': {
-                'structural_completeness': {'score_out_of_weight': '0.0/25.0', 'percentage_of_weight': '0.0%', 'bracket': 'Structural Sections', 'description': 'No analysis performed'},
-                'content_quality': {'score_out_of_weight': '0.0/25.0', 'percentage_of_weight': '0.0%', 'bracket': 'Content Quality', 'description': 'No analysis performed'},
-                'citation_adequacy': {'score_out_of_weight': '0.0/15.0', 'percentage_of_weight': '0.0%', 'bracket': 'Citation Adequacy', 'description': 'No analysis performed'},
-                'missing_content_analysis': {'score_out_of_weight': '0.0/35.0', 'percentage_of_weight': '0.0%', 'bracket': 'Completeness Analysis', 'description': 'No analysis performed'}
-            },
-            'percentage_breakdown': {
-                'structural_completeness': {'percentage': 0, 'bracket': 'Structural Sections', 'description': 'No analysis performed'},
-                'content_quality': {'percentage': 0, 'bracket': 'Content Quality', 'description': 'No analysis performed'},
-                'citation_adequacy': {'percentage': 0, 'bracket': 'Citation Adequacy', 'description': 'No analysis performed'},
-                'missing_content_analysis': {'percentage': 0, 'bracket': 'Completeness Analysis', 'description': 'No analysis performed'}
-            },
-            'final_score': 0,
-            'weights': {}
-        })
-    
     def _identify_strengths(self, text: str) -> List[str]:
         """Identify strengths of the research paper"""
         try:
@@ -792,7 +1198,7 @@ class ResearchPaperAssessor:
             Analyze the following research paper content and identify its main strengths.
             List 3-5 key strengths as bullet points starting with "-".
             
-            Paper content: {text[:3000]}...
+            Paper content: {self._truncate_tokens(text, 2500)}...
             
             Format your response as:
             - Strength 1
@@ -812,7 +1218,7 @@ class ResearchPaperAssessor:
             return strengths[:5] if strengths else ["Analysis completed - strengths identified"]
             
         except Exception as e:
-            print(f"Error identifying strengths: {e}")
+            logger.debug("Error identifying strengths: %s", e)
             return ["Unable to identify strengths due to analysis error"]
     
     def _identify_weaknesses(self, text: str, missing_content: List[MissingContent]) -> List[str]:
@@ -823,7 +1229,7 @@ class ResearchPaperAssessor:
             Focus on methodological issues, gaps in analysis, or presentation problems.
             List 3-5 key weaknesses as bullet points starting with "-".
             
-            Paper content: {text[:3000]}...
+            Paper content: {self._truncate_tokens(text, 2500)}...
             
             Format your response as:
             - Weakness 1
@@ -843,7 +1249,7 @@ class ResearchPaperAssessor:
             return weaknesses[:5] if weaknesses else ["Analysis completed - weaknesses identified"]
             
         except Exception as e:
-            print(f"Error identifying weaknesses: {e}")
+            logger.debug("Error identifying weaknesses: %s", e)
             return ["Unable to identify weaknesses due to analysis error"]
     
     def _generate_recommendations(self, missing_content: List[MissingContent], weaknesses: List[str]) -> List[str]:
@@ -871,7 +1277,7 @@ class ResearchPaperAssessor:
         prompt = f"""
         Analyze the methodology section of this research paper.
         
-        Methodology: {methodology_text[:2000]}...
+        Methodology: {self._truncate_tokens(methodology_text, 1500)}...
         
         CRITICAL: Respond with ONLY valid JSON. No explanatory text.
         
@@ -886,19 +1292,9 @@ class ResearchPaperAssessor:
         try:
             response = self._call_openai(prompt, max_tokens=500)
             
-            # Clean the response to extract only JSON
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.startswith('```'):
-                response = response[3:]
-            if response.endswith('```'):
-                response = response[:-3]
-            response = response.strip()
-            
-            return json.loads(response)
+            return _extract_json(response)
         except Exception as e:
-            print(f"Methodology analysis JSON parsing error: {e}")
+            logger.debug("Methodology analysis JSON parsing error: %s", e)
             return {"score": 50, "issues": ["Unable to analyze methodology"], "suggestions": ["Review methodology section manually"]}
     
     def _analyze_literature_review(self, introduction_text: str, references: List[Any]) -> Dict[str, Any]:
@@ -907,7 +1303,7 @@ class ResearchPaperAssessor:
         Analyze the literature review in this research paper's introduction.
         Number of references found: {len(references)}
         
-        Introduction: {introduction_text[:2000]}...
+        Introduction: {self._truncate_tokens(introduction_text, 1500)}...
         
         CRITICAL: Respond with ONLY valid JSON. No explanatory text.
         
@@ -924,19 +1320,9 @@ class ResearchPaperAssessor:
         try:
             response = self._call_openai(prompt, max_tokens=500)
             
-            # Clean the response to extract only JSON
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.startswith('```'):
-                response = response[3:]
-            if response.endswith('```'):
-                response = response[:-3]
-            response = response.strip()
-            
-            return json.loads(response)
+            return _extract_json(response)
         except Exception as e:
-            print(f"Literature review analysis JSON parsing error: {e}")
+            logger.debug("Literature review analysis JSON parsing error: %s", e)
             return {"score": 50, "coverage_adequacy": "Unknown", "critical_analysis": "Unknown", "research_gap_identification": "Unknown", "suggestions": ["Review literature review manually"]}
     
     def _analyze_results(self, results_text: str) -> Dict[str, Any]:
@@ -947,7 +1333,7 @@ class ResearchPaperAssessor:
         prompt = f"""
         Analyze the results section of this research paper.
         
-        Results: {results_text[:2000]}...
+        Results: {self._truncate_tokens(results_text, 1500)}...
         
         CRITICAL: Respond with ONLY valid JSON. No explanatory text.
         
@@ -964,19 +1350,9 @@ class ResearchPaperAssessor:
         try:
             response = self._call_openai(prompt, max_tokens=500)
             
-            # Clean the response to extract only JSON
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.startswith('```'):
-                response = response[3:]
-            if response.endswith('```'):
-                response = response[:-3]
-            response = response.strip()
-            
-            return json.loads(response)
+            return _extract_json(response)
         except Exception as e:
-            print(f"Results analysis JSON parsing error: {e}")
+            logger.debug("Results analysis JSON parsing error: %s", e)
             return {"score": 50, "presentation_clarity": "Unknown", "statistical_analysis": "Unknown", "visual_elements": "Unknown", "suggestions": ["Review results section manually"]}
     
     def _analyze_discussion(self, discussion_text: str, results_text: str) -> Dict[str, Any]:
@@ -987,8 +1363,8 @@ class ResearchPaperAssessor:
         prompt = f"""
         Analyze the discussion section of this research paper.
         
-        Discussion: {discussion_text[:2000]}...
-        Results context: {results_text[:1000]}...
+        Discussion: {self._truncate_tokens(discussion_text, 1500)}...
+        Results context: {self._truncate_tokens(results_text, 800)}...
         
         CRITICAL: Respond with ONLY valid JSON. No explanatory text.
         
@@ -1006,34 +1382,28 @@ class ResearchPaperAssessor:
         try:
             response = self._call_openai(prompt, max_tokens=500)
             
-            # Clean the response to extract only JSON
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.startswith('```'):
-                response = response[3:]
-            if response.endswith('```'):
-                response = response[:-3]
-            response = response.strip()
-            
-            return json.loads(response)
+            return _extract_json(response)
         except Exception as e:
-            print(f"Discussion analysis JSON parsing error: {e}")
+            logger.debug("Discussion analysis JSON parsing error: %s", e)
             return {"score": 50, "result_interpretation": "Unknown", "literature_comparison": "Unknown", "limitations": "Unknown", "future_work": "Unknown", "suggestions": ["Review discussion section manually"]}
     
-    def _call_openai(self, prompt: str, max_tokens: int = 1000) -> str:
-        """Call OpenAI API with error handling"""
+    def _call_openai(self, prompt: str, max_tokens: int = 1000,
+                     model: str = "gpt-3.5-turbo") -> str:
+        """Call OpenAI API with error handling and a persistent response cache"""
+        cache_key = hashlib.blake2b(
+            f"{model}\x00{max_tokens}\x00{prompt}".encode()
+        ).hexdigest()
+        cached = _llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            response = requests.post(
+            response = self._session.post(
                 "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.openai_api_key}",
-                    "Content-Type": "application/json"
-                },
                 json={
-                    "model": "gpt-3.5-turbo",
+                    "model": model,
                     "messages": [
-                        {"role": "system", "content": "You are an expert research paper reviewer and academic editor with extensive experience in various research fields. When asked to provide JSON responses, you MUST respond with ONLY valid JSON. Do not include any explanatory text, markdown formatting, or code blocks. The JSON must be properly formatted and parseable."},
+                        {"role": "system", "content": _SYSTEM_MESSAGE},
                         {"role": "user", "content": prompt}
                     ],
                     "temperature": 0.0,
@@ -1060,7 +1430,8 @@ class ResearchPaperAssessor:
             content = data["choices"][0]["message"]["content"]
             if not content:
                 raise Exception("Empty response content from OpenAI API")
-            
+
+            _llm_cache.set(cache_key, content)
             return content
             
         except requests.exceptions.Timeout:
@@ -0,0 +1,86 @@
+import os
+import re
+import uuid
+from pathlib import Path
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+from backend.config import MAX_UPLOAD_BYTES
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
+_SAFE_NAME_RE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def secure_name(filename: str) -> str:
+    """Strip path components and unsafe characters from a client filename."""
+    name = Path(filename or "upload").name
+    name = _SAFE_NAME_RE.sub("_", name)
+    return name.lstrip(".") or "upload"
+
+
+def unique_upload_path(upload_dir: Path, filename: str) -> Path:
+    """Build a collision-free destination path for an uploaded file."""
+    return upload_dir / f"{uuid.uuid4().hex}_{secure_name(filename)}"
+
+
+def discard_upload(path: Path) -> None:
+    """Remove a consumed upload, dropping its cached pages first.
+
+    Once the parse has read the file its page-cache footprint is dead
+    weight; POSIX_FADV_DONTNEED releases those pages even while a parse
+    worker still holds the inode open, which a plain unlink would defer.
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+    path.unlink(missing_ok=True)
+
+
+async def read_upload(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> bytes:
+    """Read an upload fully into memory, rejecting oversized files early.
+
+    The size reported by the multipart parser is checked before reading so a
+    pathological upload fails fast instead of being buffered first; the
+    post-read check covers clients that understate the size.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+    content = await file.read()
+    if len(content) > max_bytes:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+    return content
+
+
+async def save_upload(
+    file: UploadFile,
+    path: Path,
+    chunk_size: int = CHUNK_SIZE,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+) -> None:
+    """Stream an uploaded file to disk in chunks without blocking the event loop."""
+    total = 0
+    try:
+        async with aiofiles.open(path, "wb") as out_file:
+            if hasattr(os, "posix_fadvise"):
+                # Tell the kernel the write is strictly sequential so it keeps
+                # a wide readahead window and doesn't thrash the page cache
+                # under concurrent large uploads
+                os.posix_fadvise(
+                    out_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL
+                )
+            while chunk := await file.read(chunk_size):
+                total += len(chunk)
+                if total > max_bytes:
+                    raise HTTPException(status_code=413, detail="Uploaded file is too large")
+                await out_file.write(chunk)
+    except HTTPException:
+        path.unlink(missing_ok=True)
+        raise